@@ -0,0 +1,126 @@
+"""
+测量 ``Bot.call_api`` 对本地模拟 HTTP 服务的吞吐量, 以及 API 名称到路由的解析耗时。
+
+默认关闭相同 GET 请求的合并, 每次调用都会发出一个 HTTP 请求;
+``--coalesce`` 开启合并, 测量并发的相同请求共享同一次请求时的吞吐量。
+
+用法:
+    python benchmarks/bench_call_api.py [--calls 2000] [--concurrency 50] [--driver ~httpx] [--coalesce]
+"""
+import json
+import time
+import timeit
+import asyncio
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import nonebot
+from nonebot.adapters.kaiheila.api.handle import resolve_route, api_name_to_path
+
+BODY = json.dumps(
+    {
+        "code": 0,
+        "message": "操作成功",
+        "data": {"id": "2418200000", "username": "tester", "identify_num": "1234"},
+    }
+).encode()
+
+API_NAMES = ["user_view", "channelRole_index", "guildRole_list", "message_create"]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    requests = 0
+
+    def _reply(self):
+        MockHandler.requests += 1
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.send_header("X-Rate-Limit-Limit", "1000000")
+        self.send_header("X-Rate-Limit-Remaining", "1000000")
+        self.send_header("X-Rate-Limit-Reset", "1")
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+def bench_resolve() -> None:
+    number = 100000
+    uncached = min(
+        timeit.repeat(
+            lambda: [api_name_to_path(name) for name in API_NAMES],
+            number=number,
+            repeat=5,
+        )
+    )
+    cached = min(
+        timeit.repeat(
+            lambda: [resolve_route(name) for name in API_NAMES],
+            number=number,
+            repeat=5,
+        )
+    )
+    per_call = number * len(API_NAMES)
+    print(
+        f"route resolve: translate {uncached / per_call * 1e9:.0f} ns, "
+        f"memoized {cached / per_call * 1e9:.0f} ns"
+    )
+
+
+async def bench_calls(calls: int, concurrency: int, port: int) -> None:
+    from nonebot.adapters.kaiheila import Bot, Adapter
+
+    adapter = Adapter(nonebot.get_driver())
+    adapter.api_root = f"http://127.0.0.1:{port}/api/v3/"
+    bot = Bot(adapter, "3300000000", "bench", "token")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call():
+        async with semaphore:
+            await bot.user_view(user_id="2418200000")
+
+    await asyncio.gather(*(call() for _ in range(min(100, calls))))
+    requests = MockHandler.requests
+    start = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(calls)))
+    elapsed = time.perf_counter() - start
+    print(
+        f"call_api: {calls} calls in {elapsed:.2f}s, "
+        f"{calls / elapsed:.0f} calls/s (concurrency {concurrency}, "
+        f"{MockHandler.requests - requests} HTTP requests)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--driver", default="~httpx+~websockets")
+    parser.add_argument("--coalesce", action="store_true")
+    args = parser.parse_args()
+
+    bench_resolve()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        nonebot.init(
+            driver=args.driver,
+            log_level="WARNING",
+            kaiheila_api_coalesce=args.coalesce,
+        )
+        asyncio.run(bench_calls(args.calls, args.concurrency, server.server_port))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+统计 ``import nonebot.adapters.kaiheila`` 的导入耗时 (基于 ``python -X importtime``)。
+
+用法:
+    python benchmarks/bench_import.py [--access Adapter] [--top 15]
+
+``--access`` 额外访问包内的属性 (如 ``Adapter``), 统计按需导入后的总耗时。
+"""
+import sys
+import argparse
+import subprocess
+
+PACKAGE = "nonebot.adapters.kaiheila"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--access", action="append", default=[])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    code = f"import {PACKAGE}" + "".join(f"; {PACKAGE}.{name}" for name in args.access)
+
+    runs = []
+    for _ in range(args.repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        modules = {}
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:") :].split("|")
+            if not self_us.strip().isdigit():
+                continue
+            modules[name.strip()] = (int(self_us), int(cumulative_us))
+        runs.append(modules)
+
+    best = min(runs, key=lambda modules: sum(v[0] for v in modules.values()))
+    total = sum(self_us for self_us, _ in best.values())
+    print(
+        f"`{code}`: {total / 1000:.1f} ms in {len(best)} modules (best of {args.repeat})"
+    )
+    print(f"{'self(ms)':>10} {'cumulative(ms)':>15}  module")
+    for name, (self_us, cumulative_us) in sorted(
+        best.items(), key=lambda item: item[1][0], reverse=True
+    )[: args.top]:
+        print(f"{self_us / 1000:10.1f} {cumulative_us / 1000:15.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+对比各 JSON 后端解码 KOOK 网关消息帧与编码心跳包的耗时。
+
+用法:
+    python benchmarks/bench_json.py [frames.jsonl]
+
+frames.jsonl 为录制的网关消息帧 (每行一帧, 已解压); 未提供时使用内置的示例帧。
+"""
+import sys
+import json
+import timeit
+from pathlib import Path
+
+from nonebot.adapters.kaiheila.utils import JsonCodec, _json_codec_factories
+
+SAMPLE_FRAMES = [
+    {
+        "s": 0,
+        "sn": 1024,
+        "d": {
+            "channel_type": "GROUP",
+            "type": 9,
+            "target_id": "1234567890123456",
+            "author_id": "2418200000",
+            "content": "(met)3300000000(met) 你好 **世界**",
+            "msg_id": "6ad0e3a8-aa74-4b37-9d6a-3e3b4a5b6c7d",
+            "msg_timestamp": 1700000000000,
+            "nonce": "",
+            "extra": {
+                "type": 9,
+                "guild_id": "6543210987654321",
+                "channel_name": "闲聊",
+                "mention": ["3300000000"],
+                "mention_all": False,
+                "mention_roles": [],
+                "mention_here": False,
+                "nav_channels": [],
+                "code": "",
+                "author": {
+                    "id": "2418200000",
+                    "username": "tester",
+                    "identify_num": "1234",
+                    "online": True,
+                    "os": "Websocket",
+                    "status": 1,
+                    "avatar": "https://img.kaiheila.cn/avatars/2020-02/xxxx.jpg/icon",
+                    "vip_avatar": "https://img.kaiheila.cn/avatars/2020-02/xxxx.jpg/icon",
+                    "nickname": "tester",
+                    "roles": [111, 222],
+                    "bot": False,
+                },
+                "kmarkdown": {
+                    "raw_content": "@bot 你好 世界",
+                    "mention_part": [
+                        {
+                            "id": "3300000000",
+                            "username": "bot",
+                            "full_name": "bot#0001",
+                            "avatar": "https://img.kaiheila.cn/avatars/bot.png",
+                        }
+                    ],
+                    "mention_role_part": [],
+                },
+            },
+        },
+    },
+    {
+        "s": 0,
+        "sn": 1025,
+        "d": {
+            "channel_type": "GROUP",
+            "type": 10,
+            "target_id": "1234567890123456",
+            "author_id": "2418200000",
+            "content": json.dumps(
+                [
+                    {
+                        "type": "card",
+                        "theme": "secondary",
+                        "size": "lg",
+                        "modules": [
+                            {
+                                "type": "section",
+                                "text": {"type": "kmarkdown", "content": "第%d行" % i},
+                            }
+                            for i in range(50)
+                        ],
+                    }
+                ],
+                ensure_ascii=False,
+            ),
+            "msg_id": "7be1f4b9-bb85-4c48-8e7b-4f4c5b6c7d8e",
+            "msg_timestamp": 1700000000100,
+            "nonce": "",
+            "extra": {"type": 10, "guild_id": "6543210987654321", "author": {}},
+        },
+    },
+    {
+        "s": 0,
+        "sn": 1026,
+        "d": {
+            "channel_type": "GROUP",
+            "type": 255,
+            "target_id": "6543210987654321",
+            "author_id": "1",
+            "content": "[系统消息]",
+            "msg_id": "8cf2a5ca-cc96-4d59-9f8c-5a5d6c7d8e9f",
+            "msg_timestamp": 1700000000200,
+            "nonce": "",
+            "extra": {
+                "type": "updated_guild",
+                "body": {
+                    "id": "6543210987654321",
+                    "name": "测试服务器",
+                    "user_id": "2418200000",
+                    "icon": "https://img.kaiheila.cn/icons/xxxx.png",
+                    "notify_type": 2,
+                    "region": "beijing",
+                    "enable_open": 1,
+                    "open_id": 123456,
+                    "default_channel_id": "1234567890123456",
+                    "welcome_channel_id": "0",
+                },
+            },
+        },
+    },
+]
+
+
+def load_frames() -> list:
+    if len(sys.argv) > 1:
+        lines = Path(sys.argv[1]).read_bytes().splitlines()
+        return [line for line in lines if line.strip()]
+    return [json.dumps(frame, ensure_ascii=False).encode() for frame in SAMPLE_FRAMES]
+
+
+def bench(codec: JsonCodec, frames: list, number: int) -> None:
+    heartbeat = {"s": 2, "sn": 1026}
+
+    def decode():
+        for frame in frames:
+            codec.loads(frame)
+
+    decode_time = min(timeit.repeat(decode, number=number, repeat=5))
+    encode_time = min(
+        timeit.repeat(lambda: codec.dumps(heartbeat), number=number, repeat=5)
+    )
+    print(
+        f"{codec.name:>8}: "
+        f"decode {decode_time / number / len(frames) * 1e6:8.2f} us/frame, "
+        f"heartbeat encode {encode_time / number * 1e6:6.2f} us"
+    )
+
+
+def main() -> None:
+    frames = load_frames()
+    print(f"{len(frames)} frames, {sum(map(len, frames))} bytes")
+    for name, factory in _json_codec_factories.items():
+        try:
+            codec = factory()
+        except ImportError:
+            print(f"{name:>8}: not installed")
+            continue
+        bench(codec, frames, number=2000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+测量 ``Bot.upload_file`` 向本地模拟 HTTP 服务上传文件的吞吐量、延迟, 以及上传期间事件循环的最长卡顿。
+
+加上 ``--trace-memory`` 时用 tracemalloc 统计上传期间的内存峰值 (会明显拖慢上传)。
+上传缓存被关闭, 每次都实际上传文件。
+
+用法:
+    python benchmarks/bench_upload.py [--size-mb 200] [--repeat 3] [--driver ~httpx] [--trace-memory]
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import nonebot
+
+BODY = json.dumps(
+    {
+        "code": 0,
+        "message": "操作成功",
+        "data": {"url": "https://img.kaiheila.cn/assets/bench.bin"},
+    }
+).encode()
+
+CHUNK_SIZE = 64 * 1024
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        while length > 0:
+            length -= len(self.rfile.read(min(length, CHUNK_SIZE)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def watch_loop(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """返回事件循环的最长卡顿秒数"""
+    max_lag = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, time.perf_counter() - start - interval)
+    return max_lag
+
+
+async def bench_upload(path: str, size: int, repeat: int, port: int, trace: bool):
+    from nonebot.adapters.kaiheila import Bot, Adapter
+
+    adapter = Adapter(nonebot.get_driver())
+    adapter.api_root = f"http://127.0.0.1:{port}/api/v3/"
+    # 重复上传同一个文件会命中上传缓存, 测量时关闭
+    adapter.asset_cache = None
+    bot = Bot(adapter, "3300000000", "bench", "token")
+
+    for i in range(repeat):
+        stop = asyncio.Event()
+        watcher = asyncio.create_task(watch_loop(stop))
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        await bot.upload_file(path, "bench.bin")
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace else None
+        if trace:
+            tracemalloc.stop()
+        stop.set()
+        max_lag = await watcher
+        print(
+            f"#{i + 1}: {size / 1024 / 1024:.0f} MiB in {elapsed:.2f}s, "
+            f"{size / elapsed / 1024 / 1024:.1f} MiB/s, "
+            f"max loop lag {max_lag * 1000:.1f} ms"
+            + (f", peak memory {peak / 1024 / 1024:.1f} MiB" if peak else "")
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--driver", default="~httpx+~websockets")
+    parser.add_argument("--trace-memory", action="store_true")
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    with tempfile.NamedTemporaryFile(suffix=".bin", delete=False) as f:
+        for _ in range(size // CHUNK_SIZE):
+            f.write(os.urandom(CHUNK_SIZE))
+    try:
+        nonebot.init(driver=args.driver, log_level="WARNING")
+        asyncio.run(
+            bench_upload(
+                f.name, size, args.repeat, server.server_port, args.trace_memory
+            )
+        )
+    finally:
+        server.shutdown()
+        os.unlink(f.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+对比每次构建校验器 (``nonebot.compat.type_validate_python``) 与缓存校验器
+(``compat.get_validator``) 解析事件与 API 返回值的耗时。
+
+用法:
+    python benchmarks/bench_validator.py
+"""
+import copy
+import timeit
+from typing import List
+
+from nonebot.compat import type_validate_python
+
+from nonebot.adapters.kaiheila.compat import get_validator
+from nonebot.adapters.kaiheila.api import User, GuildUsersReturn
+from nonebot.adapters.kaiheila.event import (
+    HeartbeatMetaEvent,
+    GuildMemberOnlineNoticeEvent,
+)
+
+USER = {"id": "2418200000", "username": "tester", "identify_num": "1234", "bot": False}
+
+CASES = [
+    (
+        GuildMemberOnlineNoticeEvent,
+        {
+            "channel_type": "GROUP",
+            "type": 255,
+            "target_id": "6543210987654321",
+            "author_id": "1",
+            "content": "[系统消息]",
+            "msg_id": "8cf2a5ca-cc96-4d59-9f8c-5a5d6c7d8e9f",
+            "msg_timestamp": 1700000000200,
+            "nonce": "",
+            "extra": {
+                "type": "guild_member_online",
+                "body": {"user_id": "2418200000", "event_time": 1700000000200},
+            },
+            "self_id": "3300000000",
+            "group_id": "6543210987654321",
+            "user_id": "SYSTEM",
+            "post_type": "notice",
+            "notice_type": "guild_member_online",
+        },
+    ),
+    (HeartbeatMetaEvent, {"post_type": "meta_event", "meta_event_type": "heartbeat"}),
+    (List[User], [USER] * 20),
+    (
+        GuildUsersReturn,
+        {"items": [USER] * 50, "meta": {"page": 1, "page_total": 1, "page_size": 50}},
+    ),
+]
+
+
+def main() -> None:
+    number = 2000
+    for type_, data in CASES:
+        samples = [copy.deepcopy(data) for _ in range(number)]
+        it = iter(samples * 5)
+        uncached = min(
+            timeit.repeat(
+                lambda: type_validate_python(type_, next(it)), number=number, repeat=5
+            )
+        )
+        it = iter(samples * 5)
+        validator = get_validator(type_)
+        cached = min(
+            timeit.repeat(lambda: validator(next(it)), number=number, repeat=5)
+        )
+        name = getattr(type_, "__name__", str(type_))
+        print(
+            f"{name:>32}: uncached {uncached / number * 1e6:8.2f} us, "
+            f"cached {cached / number * 1e6:8.2f} us, "
+            f"saving {(uncached - cached) / number * 1e6:8.2f} us/call"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,35 @@
     https://developer.kaiheila.cn/doc/intro
 """
 
-from .bot import Bot as Bot
-from .event import Event as Event
-from .adapter import Adapter as Adapter
-from .message import Message as Message
-from .message import MessageSegment as MessageSegment
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .bot import Bot as Bot
+    from .event import Event as Event
+    from .adapter import Adapter as Adapter
+    from .message import Message as Message
+    from .message import MessageSegment as MessageSegment
+    from .broadcast import BroadcastTarget as BroadcastTarget
+
+# 按需导入, 避免仅导入本包时就构建全部 pydantic 模型
+_lazy_imports = {
+    "Bot": ".bot",
+    "Event": ".event",
+    "Adapter": ".adapter",
+    "Message": ".message",
+    "MessageSegment": ".message",
+    "BroadcastTarget": ".broadcast",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _lazy_imports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_lazy_imports[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return [*globals(), *_lazy_imports]
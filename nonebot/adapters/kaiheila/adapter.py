@@ -1,15 +1,27 @@
-import re
-import json
-import zlib
+import time
+import random
 import asyncio
-import inspect
+import warnings
+from io import IOBase
+from uuid import uuid4
+from pathlib import Path
 from typing_extensions import override
-from typing import Any, Dict, List, Tuple, Type, Union, Mapping, Callable, Optional
+from typing import (
+    Any,
+    Dict,
+    List,
+    Type,
+    Tuple,
+    Union,
+    Mapping,
+    Callable,
+    Iterable,
+    Optional,
+)
 
-from pygtrie import StringTrie
-from nonebot.utils import escape_tag
+from nonebot.compat import model_dump
 from nonebot.internal.driver import Response
-from nonebot.compat import model_dump, type_validate_python
+from nonebot.utils import run_sync, escape_tag
 from nonebot.drivers import (
     URL,
     Driver,
@@ -27,10 +39,29 @@ from . import event
 from .bot import Bot
 from .api.model import User
 from .config import BotConfig
+from .assets import AssetCache
+from .sequence import SnBuffer
+from .filter import FrameFilter
+from .ratelimit import RateLimiter
+from .codec import FrameDecompressor
 from .config import Config as KaiheilaConfig
 from .message import Message, MessageSegment
-from .api.handle import get_api_method, get_api_restype
-from .utils import ResultStore, log, _handle_api_result
+from .api.handle import get_route, resolve_route
+from .dispatch import DrainStats, EventDispatcher
+from .compat import get_validator, clear_validators
+from .retry import NONCE_ROUTES, RetryBudget, RetryPolicy
+from .gateway import Backoff, SessionState, GatewaySession
+from .admission import AdmissionTicket, AdmissionController
+from .cache import DEFAULT_TTLS, SingleFlight, ResponseCache, request_key
+from .checkpoint import Checkpoint, CheckpointStore, create_checkpoint_store
+from .utils import (
+    ResultStore,
+    log,
+    json_dumps,
+    json_loads,
+    set_json_codec,
+    _handle_api_result,
+)
 from .event import (
     Event,
     EventTypes,
@@ -39,37 +70,98 @@ from .event import (
     HeartbeatMetaEvent,
     LifecycleMetaEvent,
     ResumeAckMetaEvent,
+    has_event_model,
 )
 from .exception import (
+    SnGapError,
     TokenError,
     ActionFailed,
     NetworkError,
     ReconnectError,
     ApiNotAvailable,
+    HelloTimeoutError,
     RateLimitException,
+    HeartbeatTimeoutError,
     UnauthorizedException,
     KaiheilaAdapterException,
 )
 
-RECONNECT_INTERVAL = 3.0
+
+def _file_rewinder(files: Any) -> Optional[Callable[[], None]]:
+    """记录上传文件流的起始位置, 重发请求前将其移回起点"""
+    if not files:
+        return None
+    values = files.values() if isinstance(files, dict) else (v for _, v in files)
+    streams = []
+    for value in values:
+        content = value[1] if isinstance(value, tuple) else value
+        if isinstance(content, IOBase) and content.seekable():
+            streams.append((content, content.tell()))
+    if not streams:
+        return None
+
+    def rewind() -> None:
+        for stream, position in streams:
+            stream.seek(position)
+
+    return rewind
 
 
 class Adapter(BaseAdapter):
-    # init all event models
-    event_models: StringTrie = StringTrie(separator=".")
-    for model_name in dir(event):
-        model = getattr(event, model_name)
-        if not inspect.isclass(model) or not issubclass(model, OriginEvent):
-            continue
-        event_models["." + model.__event__] = model
+    _config_filter: Optional[Tuple[KaiheilaConfig, FrameFilter]] = None
+    """最近一次由配置构建的过滤器, 以配置对象本身为键"""
 
     @override
     def __init__(self, driver: Driver, **kwargs: Any):
         super().__init__(driver, **kwargs)
         self.kaiheila_config: KaiheilaConfig = get_plugin_config(KaiheilaConfig)
+        set_json_codec(self.kaiheila_config.kaiheila_json_codec)
+        self.frame_filter = self._frame_filter_for(self.kaiheila_config)
+        self.rate_limiter = RateLimiter()
+        self.retry_policy = RetryPolicy(
+            max_retries=self.kaiheila_config.kaiheila_api_retries,
+            base_delay=self.kaiheila_config.kaiheila_api_retry_base_delay,
+            max_delay=self.kaiheila_config.kaiheila_api_retry_max_delay,
+            budget=RetryBudget(self.kaiheila_config.kaiheila_api_retry_budget),
+            retry_unsafe=self.kaiheila_config.kaiheila_api_retry_unsafe,
+        )
+        self.api_cache: Optional[ResponseCache] = (
+            ResponseCache(
+                {**DEFAULT_TTLS, **self.kaiheila_config.kaiheila_api_cache_ttl},
+                self.kaiheila_config.kaiheila_api_cache_size,
+            )
+            if self.kaiheila_config.kaiheila_api_cache
+            else None
+        )
+        self.inflight = SingleFlight()
+        self.asset_cache: Optional[AssetCache] = (
+            AssetCache(
+                self.kaiheila_config.kaiheila_asset_cache_size,
+                self.kaiheila_config.kaiheila_asset_cache_path,
+            )
+            if self.kaiheila_config.kaiheila_asset_cache_size > 0
+            else None
+        )
         self.api_root = "https://www.kaiheila.cn/api/v3/"
         self.connections: Dict[str, WebSocket] = {}
-        self.tasks: List[asyncio.Task] = []
+        self.dispatchers: Dict[str, EventDispatcher] = {}
+        self.decompressors: Dict[str, FrameDecompressor] = {}
+        self.checkpoint_store: CheckpointStore = create_checkpoint_store(
+            self.kaiheila_config.kaiheila_checkpoint_path,
+            self.kaiheila_config.kaiheila_checkpoint_interval,
+        )
+        self.sessions: Dict[str, GatewaySession] = {}
+        self.admission = AdmissionController(
+            self.kaiheila_config.kaiheila_handshake_concurrency,
+            self.kaiheila_config.kaiheila_handshake_jitter,
+        )
+        self.bot_configs: Dict[str, BotConfig] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self._bots_lock: Optional[asyncio.Lock] = None
+        self._bots_file_mtime: Optional[float] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self.draining = False
+        self._drained: Optional[asyncio.Event] = None
         self.setup()
 
     # OK
@@ -122,18 +214,7 @@ class Adapter(BaseAdapter):
             if not self.api_root:
                 raise ApiNotAvailable()
 
-            match = re.findall(r"[A-Z]", api)
-            if len(match) > 0:
-                for m in match:
-                    api = api.replace(m, "-" + m.lower())
-            api = api.replace("_", "/")
-
-            if api.startswith("/api/v3/"):
-                api = api[len("/api/v3/") :]
-            elif api.startswith("api/v3"):
-                api = api[len("api/v3") :]
-            api = api.strip("/")
-            return await self._do_call_api(api, data, bot.token)
+            return await self._do_call_api(resolve_route(api).path, data, bot.token)
 
         else:
             raise ApiNotAvailable
@@ -146,9 +227,10 @@ class Adapter(BaseAdapter):
     ) -> Any:
         log("DEBUG", f"Calling API <y>{api}</y>")
         data = dict(data) if data is not None else {}
+        route = get_route(api)
 
         # 判断 POST 或 GET
-        method = get_api_method(api) if not data.get("method") else data.get("method")
+        method = route.method if not data.get("method") else data.get("method")
 
         headers = data.get("headers", {})
 
@@ -163,6 +245,22 @@ class Adapter(BaseAdapter):
             files = {"file": data["file"]}
             del data["file"]
 
+        # GET 请求是幂等的, 可以缓存结果并合并并发的相同请求
+        key = None
+        cacheable = False
+        if method == "GET" and not files:
+            key = request_key(token or "", api, data)
+            if self.api_cache is not None and self.api_cache.cacheable(api):
+                cacheable = True
+                hit, result = self.api_cache.get(key)
+                if hit:
+                    log("TRACE", f"API <y>{api}</y> served from cache")
+                    return route.validator(result) if route.validator else None
+
+        # 可重试的消息发送接口自动附带 nonce, 服务端原样返回, 可据此识别重复发送的消息
+        if api in NONCE_ROUTES and self.retry_policy.max_retries_for(api, method):
+            data.setdefault("nonce", uuid4().hex)
+
         if method == "GET":
             query = data
         elif method == "POST":
@@ -180,13 +278,62 @@ class Adapter(BaseAdapter):
             files=files,
             timeout=self.config.api_timeout,
         )
-        result_type = get_api_restype(api)
-        try:
-            resp = await self.request(request)
+
+        rewind = _file_rewinder(files)
+
+        async def fetch() -> Any:
+            resp = await self.retry_policy.call(
+                api,
+                method,
+                lambda: self._send_with_rate_limit(api, request, token, rewind),
+                retry_rate_limit=not self.kaiheila_config.kaiheila_rate_limit,
+            )
             result = _handle_api_result(resp)
-            return type_validate_python(result_type, result) if result_type else None
-        except Exception as e:
-            raise e
+            if cacheable:
+                self.api_cache.set(key, result)
+            return result
+
+        if key is not None and self.kaiheila_config.kaiheila_api_coalesce:
+            # 每个调用方各自校验共享的原始结果, 得到独立的对象
+            result = await self.inflight.do(key, fetch)
+        else:
+            result = await fetch()
+        return route.validator(result) if route.validator else None
+
+    async def _send_with_rate_limit(
+        self,
+        api: str,
+        request: Request,
+        token: Optional[str],
+        rewind: Optional[Callable[[], None]] = None,
+    ) -> Response:
+        if not self.kaiheila_config.kaiheila_rate_limit:
+            if rewind is not None:
+                rewind()
+            return await self.request(request)
+
+        token = token or ""
+        retries = self.kaiheila_config.kaiheila_rate_limit_retries
+        attempt = 0
+        while True:
+            waited = await self.rate_limiter.acquire(token, api)
+            if waited:
+                log("DEBUG", f"API <y>{api}</y> waited {waited:.2f}s for rate limit")
+            if rewind is not None:
+                rewind()
+            try:
+                resp = await self.request(request)
+            except RateLimitException as e:
+                self.rate_limiter.update(token, api, e.headers, limited=True)
+                attempt += 1
+                if attempt > retries:
+                    raise
+                log(
+                    "DEBUG", f"API <y>{api}</y> got 429, requeued ({attempt}/{retries})"
+                )
+                continue
+            self.rate_limiter.update(token, api, resp.headers)
+            return resp
 
     async def _get_bot_info(self, token: str) -> User:
         return await self._do_call_api("user/me", token=token)
@@ -200,84 +347,502 @@ class Adapter(BaseAdapter):
         return result.url
 
     async def start_forward(self) -> None:
-        for bot in self.kaiheila_config.kaiheila_bots:
-            self.tasks.append(asyncio.create_task(self._forward_ws(bot)))
+        bots = self.kaiheila_config.kaiheila_bots
+        path = self.kaiheila_config.kaiheila_bots_file
+        if path is not None:
+            loaded = await self._load_bots_file(path)
+            if loaded is not None:
+                bots, self._bots_file_mtime = loaded
+            self._watch_task = asyncio.create_task(self._watch_bots_file(path))
+        await self.sync_bots(bots)
 
     async def stop_forward(self) -> None:
-        for task in self.tasks:
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+        try:
+            await self.drain(self.kaiheila_config.kaiheila_drain_timeout)
+        except Exception as e:
+            log("ERROR", "<r><bg #f8bbd0>Failed to drain</bg #f8bbd0></r>", e)
+        tasks = list(self.tasks.values())
+        for task in tasks:
             if not task.done():
                 task.cancel()
 
         await asyncio.gather(
-            *(asyncio.wait_for(task, timeout=10) for task in self.tasks),
+            *(asyncio.wait_for(task, timeout=10) for task in tasks),
             return_exceptions=True,
         )
+        await self.checkpoint_store.close()
 
-    async def _forward_ws(self, bot_config: BotConfig) -> None:
-        self_id: Optional[str] = None
-        need_reconnect = False
-        original_url: Optional[str] = None
-        session_id: Optional[str] = None
-        bot: Optional[Bot] = None
+    async def drain(self, timeout: float) -> DrainStats:
+        """
+        :说明:
 
-        heartbeat_task: Optional[asyncio.Task] = None
+          停机前排空: 停止读取新消息, 等待已接收事件的处理与发送队列中的消息完成,
+          最多等待 ``timeout`` 秒, 之后保存断点, 各连接关闭 websocket 并退出。
+
+          断点只记录到最早一个未处理完成的事件之前, 到达时限时仍在排队或被取消的事件
+          在下次启动 resume 时由服务端重新推送。
+
+        :参数:
+
+          * ``timeout: float``: 最长等待秒数
+
+        :返回:
+
+          - ``DrainStats``: 排空统计信息
+        """
+        start = time.monotonic()
+        self.draining = True
+        self._drained = asyncio.Event()
+
+        dispatchers = list(self.dispatchers.values())
+        outboxes = [bot.outbox for bot in self.bots.values() if bot.outbox is not None]
+        processed = sum(dispatcher.processed for dispatcher in dispatchers)
+        sent = sum(outbox.sent + outbox.failed for outbox in outboxes)
+
+        async def join() -> None:
+            # 事件处理过程中可能继续提交消息, 先等待事件处理完成
+            await asyncio.gather(*(dispatcher.join() for dispatcher in dispatchers))
+            await asyncio.gather(*(outbox.join() for outbox in outboxes))
+
+        try:
+            await asyncio.wait_for(join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        for token, session in self.sessions.items():
+            if not session.can_resume():
+                continue
+            self.checkpoint_store.save(token, self._checkpoint(session))
+        await self.checkpoint_store.flush()
+        self._drained.set()
+
+        dispatcher_stats = [dispatcher.stats() for dispatcher in dispatchers]
+        stats = DrainStats(
+            events=sum(s.processed for s in dispatcher_stats) - processed,
+            sends=sum(outbox.sent + outbox.failed for outbox in outboxes) - sent,
+            cancelled=sum(s.in_flight for s in dispatcher_stats)
+            + sum(outbox.active for outbox in outboxes),
+            lost=sum(s.queue_depth for s in dispatcher_stats)
+            + sum(outbox.pending for outbox in outboxes),
+            elapsed=time.monotonic() - start,
+        )
+        log(
+            "WARNING" if stats.cancelled or stats.lost else "INFO",
+            f"Drained {stats.events} events and {stats.sends} messages "
+            f"in {stats.elapsed:.2f}s, cancelled: {stats.cancelled}, "
+            f"lost: {stats.lost}",
+        )
+        return stats
+
+    def _lock(self) -> asyncio.Lock:
+        # 在事件循环中创建, 兼容 Python 3.8/3.9 的 asyncio.Lock
+        if self._bots_lock is None:
+            self._bots_lock = asyncio.Lock()
+        return self._bots_lock
+
+    async def add_bot(self, bot_config: BotConfig) -> None:
+        """
+        :说明:
+
+          运行时添加 Bot 并开始连接, 有断点时从断点恢复会话。
+
+          该 token 已在运行时抛出 ``ValueError``。
+
+        :参数:
+
+          * ``bot_config: BotConfig``: Bot 配置
+        """
+        async with self._lock():
+            self._start_bot(bot_config)
+
+    async def remove_bot(self, token: str, forget: bool = False) -> bool:
+        """
+        :说明:
 
+          运行时移除 Bot: 断开连接, 停止事件处理并清理连接与 sn 状态, 不影响其他 Bot。
+
+          默认保留断点, 之后以同一 token 重新添加时从断点恢复会话。
+
+        :参数:
+
+          * ``token: str``: Bot token
+          * ``forget: bool``: 是否同时删除断点
+
+        :返回:
+
+          - ``bool``: 该 token 是否存在
+        """
+        async with self._lock():
+            return await self._stop_bot(token, forget)
+
+    async def rotate_bot(self, old_token: str, bot_config: BotConfig) -> None:
+        """
+        :说明:
+
+          更换 Bot 的 token: 断开旧 token 的连接, 将断点转移到新 token 后以新 token 重新连接,
+          会话能恢复时不丢失断开期间的事件, 否则建立新会话。
+
+        :参数:
+
+          * ``old_token: str``: 原 token
+          * ``bot_config: BotConfig``: 新 token 的 Bot 配置
+        """
+        async with self._lock():
+            await self._stop_bot(old_token)
+            checkpoint = await self.checkpoint_store.load(old_token)
+            self.checkpoint_store.delete(old_token)
+            if checkpoint is not None:
+                # 网关地址绑定旧 token, 新 token 重新获取网关后按 session_id 与 sn resume
+                self.checkpoint_store.save(
+                    bot_config.token, checkpoint._replace(gateway_url="")
+                )
+            self._start_bot(bot_config)
+
+    async def sync_bots(self, bots: Iterable[BotConfig]) -> None:
+        """
+        :说明:
+
+          使运行中的 Bot 与 ``bots`` 一致: 启动新增的 Bot, 停止不再存在的 Bot,
+          配置有变化的 Bot 重新连接 (从断点恢复会话), 其余 Bot 不受影响。
+
+        :参数:
+
+          * ``bots: Iterable[BotConfig]``: Bot 配置列表
+        """
+        configs = {bot.token: bot for bot in bots}
+        async with self._lock():
+            for token, bot_config in list(self.bot_configs.items()):
+                if configs.get(token) != bot_config:
+                    await self._stop_bot(token)
+            for token, bot_config in configs.items():
+                task = self.tasks.get(token)
+                if task is None or task.done():
+                    self._start_bot(bot_config)
+
+    def _start_bot(self, bot_config: BotConfig) -> None:
+        token = bot_config.token
+        task = self.tasks.get(token)
+        if task is not None and not task.done():
+            raise ValueError(f"Bot with token {token[:8]}... is already running")
+        self.bot_configs[token] = bot_config
+        self.tasks[token] = asyncio.create_task(self._forward_ws(bot_config))
+
+    async def _stop_bot(self, token: str, forget: bool = False) -> bool:
+        task = self.tasks.pop(token, None)
+        self.bot_configs.pop(token, None)
+        if task is None:
+            return False
+        task.cancel()
+        # asyncio.wait 不会将任务的取消传播给调用方
+        await asyncio.wait({task}, timeout=10)
+
+        session = self.sessions.pop(token, None)
+        if session is not None and session.self_id is not None:
+            self.connections.pop(session.self_id, None)
+            ResultStore.clear_sn(session.self_id)
+        if forget:
+            self.checkpoint_store.delete(token)
+        await self.checkpoint_store.flush()
+        return True
+
+    async def _load_bots_file(
+        self, path: Path
+    ) -> Optional[Tuple[List[BotConfig], float]]:
+        try:
+            mtime = (await run_sync(path.stat)()).st_mtime
+            data = json_loads(await run_sync(path.read_bytes)())
+            bots = get_validator(List[BotConfig])(data)
+        except Exception as e:
+            log(
+                "ERROR",
+                f"<r><bg #f8bbd0>Failed to load bots from {escape_tag(str(path))}"
+                "</bg #f8bbd0></r>",
+                e,
+            )
+            return None
+        return bots, mtime
+
+    async def _watch_bots_file(self, path: Path) -> None:
+        """每隔 ``kaiheila_bots_file_interval`` 秒检查文件修改时间, 有变化时同步 Bot 列表"""
         while True:
+            await asyncio.sleep(self.kaiheila_config.kaiheila_bots_file_interval)
             try:
-                if need_reconnect:
-                    sn = ResultStore.get_sn(self_id)
-                    log("INFO", f"Reconnecting..., session_id: {session_id}, sn: {sn}")
-                    url = original_url + "&".join(
-                        ["", "resume=1", f"sn={sn}", f"session_id={session_id}"]
-                    )
-                else:
-                    try:
-                        url = original_url = await self._get_gateway(bot_config.token)
-                    except TokenError as e:
+                mtime = (await run_sync(path.stat)()).st_mtime
+            except OSError:
+                continue
+            if mtime == self._bots_file_mtime:
+                continue
+            loaded = await self._load_bots_file(path)
+            if loaded is None:
+                # 等待下一次修改, 避免重复报错
+                self._bots_file_mtime = mtime
+                continue
+            bots, self._bots_file_mtime = loaded
+            log("INFO", f"Bots file {escape_tag(str(path))} changed, syncing bots")
+            try:
+                await self.sync_bots(bots)
+            except Exception as e:
+                log("ERROR", "<r><bg #f8bbd0>Failed to sync bots</bg #f8bbd0></r>", e)
+
+    async def _forward_ws(self, bot_config: BotConfig) -> None:
+        config = self.kaiheila_config
+        token = bot_config.token
+        session = self.sessions[token] = GatewaySession(token)
+        backoff = Backoff(
+            config.kaiheila_reconnect_base_delay, config.kaiheila_reconnect_max_delay
+        )
+        dispatcher = EventDispatcher(
+            name=token[:8],
+            workers=bot_config.dispatch_workers or config.kaiheila_dispatch_workers,
+            queue_size=config.kaiheila_dispatch_queue_size,
+            put_timeout=config.kaiheila_dispatch_put_timeout,
+        )
+
+        # 从断点恢复会话
+        checkpoint = await self.checkpoint_store.load(token)
+        if checkpoint is not None:
+            session.self_id = checkpoint.self_id
+            session.session_id = checkpoint.session_id
+            if checkpoint.gateway_url:
+                session.set_gateway(checkpoint.gateway_url)
+            ResultStore.set_sn(checkpoint.self_id, checkpoint.sn)
+
+        try:
+            first = True
+            while True:
+                # 限制同时握手的连接数, 直到 HELLO 后获取到 Bot 信息才归还名额
+                ticket = await self.admission.admit(bot_config.weight, jitter=not first)
+                first = False
+                try:
+                    resuming = session.can_resume()
+                    if resuming:
+                        sn = ResultStore.get_sn(session.self_id)
+                        session.transition(SessionState.RESUMING, f"sn={sn}")
                         log(
-                            "ERROR",
-                            f"<r><bg #f8bbd0>Token {escape_tag(bot_config.token)} was invalid. "
-                            "Please get a new token from https://developer.kaiheila.cn/app/index </bg #f8bbd0></r>",
-                            e,
+                            "INFO",
+                            f"Resuming..., session_id: {session.session_id}, sn: {sn}",
                         )
-                        return
-                    except Exception as e:
-                        log(
-                            "ERROR",
-                            f"<r><bg #f8bbd0>Failed to get the Gateway URL for token {escape_tag(bot_config.token)}. "
-                            "Trying to reconnect...</bg #f8bbd0></r>",
-                            e,
+                        url = session.resume_url(sn)
+                    elif session.gateway_valid(config.kaiheila_gateway_url_ttl):
+                        session.transition(SessionState.CONNECTING, "reuse gateway")
+                        url = session.gateway_url
+                    else:
+                        session.transition(SessionState.FETCHING_GATEWAY)
+                        try:
+                            session.set_gateway(str(await self._get_gateway(token)))
+                        except TokenError as e:
+                            log(
+                                "ERROR",
+                                f"<r><bg #f8bbd0>Token {escape_tag(token)} was invalid. "
+                                "Please get a new token from https://developer.kaiheila.cn/app/index </bg #f8bbd0></r>",
+                                e,
+                            )
+                            return
+                        except Exception as e:
+                            log(
+                                "ERROR",
+                                f"<r><bg #f8bbd0>Failed to get the Gateway URL for token {escape_tag(token)}. "
+                                "Trying to reconnect...</bg #f8bbd0></r>",
+                                e,
+                            )
+                            session.transition(
+                                SessionState.DISCONNECTED,
+                                f"failed to get gateway: {e!r}",
+                            )
+                        else:
+                            resuming = session.can_resume()
+                            if resuming:
+                                # 有会话但没有可用的网关地址 (如更换 token 后), 在新网关上 resume
+                                sn = ResultStore.get_sn(session.self_id)
+                                session.transition(
+                                    SessionState.RESUMING, f"new gateway, sn={sn}"
+                                )
+                                url = session.resume_url(sn)
+                            else:
+                                session.transition(
+                                    SessionState.CONNECTING, "new gateway"
+                                )
+                                url = session.gateway_url
+
+                    if session.state is not SessionState.DISCONNECTED:
+                        if not resuming and session.self_id is not None:
+                            ResultStore.set_sn(session.self_id, 0)
+                        reason = await self._run_session(
+                            session,
+                            bot_config,
+                            url,
+                            dispatcher,
+                            backoff,
+                            resuming,
+                            ticket,
                         )
-                        await asyncio.sleep(RECONNECT_INTERVAL)
-                        continue
-
-                headers = {}
-                if bot_config.token:
-                    headers["Authorization"] = f"Bot {bot_config.token}"
-                request = Request("GET", URL(url), headers=headers)
-                log("INFO", f"Connecting to {escape_tag(str(url))}")
-                async with self.websocket(request) as ws:
-                    log(
-                        "DEBUG",
-                        f"WebSocket Connection to {escape_tag(str(url))} established",
+                        session.transition(SessionState.DISCONNECTED, reason)
+                        if self.draining:
+                            return
+                finally:
+                    ticket.release()
+
+                delay = backoff.next()
+                session.transition(SessionState.BACKOFF, f"retry in {delay:.2f}s")
+                await asyncio.sleep(delay)
+        finally:
+            session.transition(SessionState.STOPPED)
+            await dispatcher.stop()
+            if session.self_id is not None:
+                self.dispatchers.pop(session.self_id, None)
+                self.decompressors.pop(session.self_id, None)
+
+    def _reset_session(self, session: GatewaySession) -> None:
+        """放弃会话与网关地址, 下次连接时重新获取网关并建立新会话"""
+        session.reset_session()
+        session.discard_gateway()
+        if session.self_id is not None:
+            ResultStore.set_sn(session.self_id, 0)
+        self.checkpoint_store.delete(session.token)
+
+    def _checkpoint(self, session: GatewaySession) -> Checkpoint:
+        """
+        :说明:
+
+          生成会话的断点。sn 取已接收的最新 sn, 但不越过仍在排队或处理中的事件,
+          进程意外退出后从断点 resume 时, 这些事件会由服务端重新推送。
+        """
+        sn = ResultStore.get_sn(session.self_id)
+        dispatcher = self.dispatchers.get(session.self_id or "")
+        pending = dispatcher.oldest_pending_sn() if dispatcher is not None else None
+        if pending is not None:
+            sn = min(sn, pending - 1)
+        return Checkpoint(session.self_id, session.session_id, sn, session.gateway_url)
+
+    def _connection_lost(
+        self,
+        session: GatewaySession,
+        connected: bool,
+        resuming: bool,
+        exc: BaseException,
+    ) -> str:
+        """根据断开时所处的阶段决定下一次是 resume、重新连接还是重新获取网关"""
+        if connected:
+            return f"connection lost: {exc!r}"
+        if resuming:
+            session.resume_failures += 1
+            if session.resume_failures > self.kaiheila_config.kaiheila_resume_retries:
+                self._reset_session(session)
+                return (
+                    f"resume failed {session.resume_failures} times ({exc!r}), "
+                    "starting a new session"
+                )
+            return f"resume failed: {exc!r}"
+        # 新建会话失败, 网关地址可能已失效
+        session.discard_gateway()
+        return f"handshake failed: {exc!r}"
+
+    async def _run_session(
+        self,
+        session: GatewaySession,
+        bot_config: BotConfig,
+        url: str,
+        dispatcher: EventDispatcher,
+        backoff: Backoff,
+        resuming: bool,
+        ticket: AdmissionTicket,
+    ) -> str:
+        """
+        :说明:
+
+          建立一次 websocket 连接并处理消息, 直到连接断开。
+
+        :返回:
+
+          - ``str``: 断开的原因
+        """
+        config = self.kaiheila_config
+        bot: Optional[Bot] = None
+        heartbeat_task: Optional[asyncio.Task] = None
+        resume_task: Optional[asyncio.Task] = None
+        gap_resume_sn: Optional[int] = None
+        saved_sn: Optional[int] = None
+
+        headers = {}
+        if bot_config.token:
+            headers["Authorization"] = f"Bot {bot_config.token}"
+        request = Request("GET", URL(url), headers=headers)
+        log("INFO", f"Connecting to {escape_tag(str(url))}")
+        try:
+            async with self.websocket(request) as ws:
+                log(
+                    "DEBUG",
+                    f"WebSocket Connection to {escape_tag(str(url))} established",
+                )
+                try:
+                    decompressor = FrameDecompressor(
+                        bool(config.compress),
+                        config.kaiheila_decompress_offload_threshold,
                     )
-                    try:
-                        data_decompress_func = (
-                            zlib.decompress
-                            if self.kaiheila_config.compress
-                            else lambda x: x
-                        )
-                        while True:
+                    sn_buffer = SnBuffer(
+                        ResultStore.get_sn(session.self_id) if resuming else 0,
+                        gap_timeout=config.kaiheila_sn_gap_timeout,
+                    )
+                    hello_deadline = time.monotonic() + config.kaiheila_hello_timeout
+                    while True:
+                        timeout = sn_buffer.gap_remaining()
+                        if bot is None:
+                            # 连接后需在限定时间内收到 HELLO
+                            hello_remaining = max(hello_deadline - time.monotonic(), 0)
+                            if timeout is None or hello_remaining < timeout:
+                                timeout = hello_remaining
+                        if timeout is None:
                             data = await ws.receive()
-                            data = data_decompress_func(data)
-                            json_data = json.loads(data)
+                        else:
+                            try:
+                                data = await asyncio.wait_for(ws.receive(), timeout)
+                            except asyncio.TimeoutError:
+                                if bot is None:
+                                    raise HelloTimeoutError(
+                                        config.kaiheila_hello_timeout
+                                    )
+                                resume_task = self._resume_sn_gap(
+                                    ws, session, sn_buffer, gap_resume_sn
+                                )
+                                gap_resume_sn = sn_buffer.last_sn
+                                continue
+                        if self._drained is not None:
+                            # 停机排空中, 不再处理新消息, 排空结束后关闭连接
+                            await self._drained.wait()
+                            return "shutdown"
+                        data = await decompressor.decompress(data)
+                        json_data = json_loads(data)
+                        if (
+                            isinstance(json_data, dict)
+                            and json_data.get("s") == SignalTypes.EVENT
+                        ):
+                            if self.api_cache is not None:
+                                self.api_cache.invalidate_frame(
+                                    json_data.get("d") or {}
+                                )
+                            frames = sn_buffer.push(json_data["sn"], json_data)
+                            if sn_buffer.gap_expired():
+                                resume_task = self._resume_sn_gap(
+                                    ws, session, sn_buffer, gap_resume_sn
+                                )
+                                gap_resume_sn = sn_buffer.last_sn
+                        else:
+                            frames = [json_data]
+                        for json_data in frames:
                             event = self.json_to_event(
                                 json_data,
                                 bot and bot.self_id,
-                                kaiheila_config=self.kaiheila_config,
+                                kaiheila_config=config,
+                                frame_filter=self.frame_filter,
                             )
                             if not event:
                                 continue
+                            if isinstance(event, HeartbeatMetaEvent):
+                                session.pong.set()
+                            elif isinstance(event, ResumeAckMetaEvent):
+                                session.resume_ack.set()
                             if not bot:
                                 if (
                                     not isinstance(event, LifecycleMetaEvent)
@@ -285,102 +850,290 @@ class Adapter(BaseAdapter):
                                 ):
                                     continue
                                 bot_info = await self._get_bot_info(bot_config.token)
-                                self_id = bot_info.id_
+                                self_id = session.self_id = bot_info.id_
+                                session.session_id = event.session_id
                                 bot = Bot(
                                     self, self_id, bot_info.username, bot_config.token
                                 )
                                 self.connections[self_id] = ws
+                                self.dispatchers[self_id] = dispatcher
+                                self.decompressors[self_id] = decompressor
                                 self.bot_connect(bot)
 
-                                # start heartbeat
+                                session.resume_failures = 0
+                                ticket.release(ok=True)
+                                session.transition(
+                                    SessionState.CONNECTED,
+                                    "resumed" if resuming else "hello",
+                                )
                                 heartbeat_task = asyncio.create_task(
-                                    self.start_heartbeat(bot)
+                                    self._heartbeat(ws, session, backoff)
                                 )
-                                session_id = event.session_id
                                 log(
                                     "INFO",
-                                    f"<y>Bot {escape_tag(self_id)}</y> connected, session_id: {session_id}",
+                                    f"<y>Bot {escape_tag(self_id)}</y> connected, session_id: {session.session_id}",
                                 )
-                                if need_reconnect:
-                                    need_reconnect = False
-                            asyncio.create_task(bot.handle_event(event))
-                    except ReconnectError as e:
-                        log(
-                            "ERROR",
-                            "<r><bg #f8bbd0>Server requests reconnect "
-                            f"{'for bot ' + escape_tag(bot.self_id) if bot else ''}, {e}</bg #f8bbd0></r>",
-                        )
-                        need_reconnect = False
-                        ResultStore.set_sn(bot.self_id, 0)
-                    except TokenError as e:
-                        log(
-                            "ERROR",
-                            "<r><bg #f8bbd0>Token error, {e}"
-                            f"{'for bot ' + escape_tag(bot.self_id) if bot else ''}, {e}</bg #f8bbd0></r>",
-                        )
-                        need_reconnect = False
-                        ResultStore.set_sn(bot.self_id, 0)
-                    except Exception as e:
-                        # 非预期异常，需要重连，不重置sn
-                        log(
-                            "ERROR",
-                            "<r><bg #f8bbd0>Error while process data from websocket"
-                            f"{escape_tag(str(url))}. Trying to reconnect...</bg #f8bbd0></r>",
-                            e,
-                        )
-                        need_reconnect = True
-                    finally:
-                        if heartbeat_task:
-                            heartbeat_task.cancel()
-                            heartbeat_task = None
+                            if json_data.get("s") == SignalTypes.EVENT:
+                                await dispatcher.dispatch(bot, event, json_data["sn"])
+                            else:
+                                # 信令不排队, 避免被事件队列的背压拖住
+                                dispatcher.dispatch_nowait(bot, event)
+                        if bot and session.session_id and self._drained is None:
+                            # 只在 sn 变化时更新断点, 心跳等信令不触发保存
+                            checkpoint = self._checkpoint(session)
+                            if checkpoint.sn != saved_sn:
+                                saved_sn = checkpoint.sn
+                                self.checkpoint_store.save(bot_config.token, checkpoint)
+                except ReconnectError as e:
+                    log(
+                        "ERROR",
+                        "<r><bg #f8bbd0>Server requests reconnect "
+                        f"{'for bot ' + escape_tag(bot.self_id) if bot else ''}, {e}</bg #f8bbd0></r>",
+                    )
+                    self._reset_session(session)
+                    return f"server requested reconnect: {e!r}"
+                except TokenError as e:
+                    log(
+                        "ERROR",
+                        "<r><bg #f8bbd0>Token error "
+                        f"{'for bot ' + escape_tag(bot.self_id) if bot else ''}, {e}</bg #f8bbd0></r>",
+                    )
+                    self._reset_session(session)
+                    return f"token error: {e!r}"
+                except Exception as e:
+                    error: BaseException = e
+                    # 心跳超时或原连接 resume 失败时由对应任务关闭连接, 以任务的异常作为断开原因
+                    for task in (resume_task, heartbeat_task):
+                        if (
+                            task is not None
+                            and task.done()
+                            and not task.cancelled()
+                            and task.exception() is not None
+                        ):
+                            error = task.exception()
+                            break
+                    # 非预期异常，需要重连，不重置sn
+                    log(
+                        "ERROR",
+                        "<r><bg #f8bbd0>Error while process data from websocket"
+                        f"{escape_tag(str(url))}. Trying to reconnect...</bg #f8bbd0></r>",
+                        error,
+                    )
+                    return self._connection_lost(
+                        session, bot is not None, resuming, error
+                    )
+                finally:
+                    if heartbeat_task:
+                        heartbeat_task.cancel()
+                        heartbeat_task = None
+                    if resume_task:
+                        resume_task.cancel()
+                        resume_task = None
 
-                        try:
-                            await ws.close()
-                        except:  # noqa: E722
-                            pass
-
-                        if bot:
-                            self.connections.pop(bot.self_id, None)
-                            self.bot_disconnect(bot)
-                            bot = None
-            except Exception as e:
-                log(
-                    "ERROR",
-                    "<r><bg #f8bbd0>Error while setup websocket to "
-                    f"{escape_tag(str(url))}. Trying to reconnect...</bg #f8bbd0></r>",
-                    e,
-                )
+                    try:
+                        await ws.close()
+                    except:  # noqa: E722
+                        pass
 
-            await asyncio.sleep(RECONNECT_INTERVAL)
+                    if bot:
+                        self.connections.pop(bot.self_id, None)
+                        self.bot_disconnect(bot)
+                        bot = None
+        except Exception as e:
+            log(
+                "ERROR",
+                "<r><bg #f8bbd0>Error while setup websocket to "
+                f"{escape_tag(str(url))}. Trying to reconnect...</bg #f8bbd0></r>",
+                e,
+            )
+            return self._connection_lost(session, False, resuming, e)
 
     async def start_heartbeat(self, bot: Bot) -> None:
         """
-        每30s一次心跳
-        :return:
+        :说明:
+
+          已弃用。心跳由每个连接自动发送, 该方法不再发送心跳, 只等待 Bot 的连接断开。
+        """
+        warnings.warn(
+            "Adapter.start_heartbeat 已弃用, 心跳由连接自动维护",
+            DeprecationWarning,
+        )
+        ws = self.connections.get(bot.self_id)
+        while ws is not None and self.connections.get(bot.self_id) is ws:
+            await asyncio.sleep(1)
+
+    async def _heartbeat(
+        self, ws: WebSocket, session: GatewaySession, backoff: Backoff
+    ) -> None:
+        """
+        :说明:
+
+          按 KOOK 文档发送心跳: 每 30±5 秒发送一次 PING, 6 秒内未收到 PONG 时间隔 2、4 秒重试,
+          仍未收到则先在原连接上 resume; 失败时关闭连接并抛出 ``HeartbeatTimeoutError``,
+          由连接循环重新连接并 resume。收到 PONG 说明连接可用, 同时重置重连退避。
         """
-        while self.connections.get(bot.self_id):
-            if self.connections.get(bot.self_id).closed:
+        config = self.kaiheila_config
+        interval = config.kaiheila_heartbeat_interval
+        retries = config.kaiheila_ping_retries
+        while True:
+            await asyncio.sleep(interval + random.uniform(-interval / 6, interval / 6))
+            for attempt in range(retries + 1):
+                session.pong.clear()
+                try:
+                    await ws.send(
+                        json_dumps(
+                            {
+                                "s": SignalTypes.PING.value,
+                                # 客户端目前收到的最新的消息 sn
+                                "sn": ResultStore.get_sn(session.self_id),
+                            }
+                        )
+                    )
+                    await self._wait_signal(
+                        session, session.pong, config.kaiheila_pong_timeout
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log(
+                        "WARNING",
+                        f"No PONG for bot {escape_tag(str(session.self_id))} "
+                        f"({attempt + 1}/{retries + 1})",
+                        None if isinstance(e, asyncio.TimeoutError) else e,
+                    )
+                    if session.state is SessionState.CONNECTED:
+                        session.transition(
+                            SessionState.HEARTBEAT_TIMEOUT, "pong timeout"
+                        )
+                    if attempt < retries:
+                        await asyncio.sleep(2 ** (attempt + 1))
+                    continue
+                if session.state is SessionState.HEARTBEAT_TIMEOUT:
+                    session.transition(SessionState.CONNECTED, "pong received")
+                backoff.reset()
                 break
+            else:
+                if config.kaiheila_inplace_resume and await self._resume_in_place(
+                    ws, session, ResultStore.get_sn(session.self_id)
+                ):
+                    backoff.reset()
+                    continue
+                try:
+                    await ws.close()
+                except:  # noqa: E722
+                    pass
+                raise HeartbeatTimeoutError(retries + 1)
+
+    async def _wait_signal(
+        self, session: GatewaySession, signal: asyncio.Event, timeout: float
+    ) -> None:
+        """
+        :说明:
+
+          等待 PONG 或 RESUME ACK 信令, 超时抛出 ``asyncio.TimeoutError``。
+
+          事件队列已满时读取 websocket 的协程被阻塞, 信令已到达却无法读取;
+          此时不计为超时, 待读取恢复后重新计时。
+        """
+        while True:
             try:
-                await self.connections.get(bot.self_id).send(
-                    json.dumps(
-                        {
-                            "s": 2,
-                            "sn": ResultStore.get_sn(bot.self_id),  # 客户端目前收到的最新的消息 sn
-                        }
-                    )
-                )
-                await asyncio.sleep(26)
-            except asyncio.CancelledError:
-                raise
+                await asyncio.wait_for(signal.wait(), timeout)
+                return
+            except asyncio.TimeoutError:
+                dispatcher = self.dispatchers.get(session.self_id or "")
+                if dispatcher is None or not dispatcher.backpressure:
+                    raise
+            await dispatcher.wait_unblocked()
+
+    def _resume_sn_gap(
+        self,
+        ws: WebSocket,
+        session: GatewaySession,
+        sn_buffer: SnBuffer,
+        tried_sn: Optional[int],
+    ) -> asyncio.Task:
+        """
+        :说明:
+
+          sn 缺口超时: 在原连接上从 ``last_sn`` 处 resume, 返回等待 RESUME ACK 的任务,
+          失败时该任务关闭连接并抛出 ``SnGapError``。
+          未开启原连接 resume, 或同一个 ``last_sn`` 已经尝试过时直接抛出 ``SnGapError``。
+        """
+        last_sn = sn_buffer.last_sn
+        if not self.kaiheila_config.kaiheila_inplace_resume or tried_sn == last_sn:
+            raise SnGapError(last_sn)
+        # 等待服务端补发缺失的消息
+        sn_buffer.restart_gap()
+
+        async def resume() -> None:
+            if not await self._resume_in_place(ws, session, last_sn):
+                try:
+                    await ws.close()
+                except:  # noqa: E722
+                    pass
+                raise SnGapError(last_sn)
+
+        return asyncio.create_task(resume())
+
+    async def _resume_in_place(
+        self, ws: WebSocket, session: GatewaySession, sn: int
+    ) -> bool:
+        """
+        :说明:
+
+          在原连接上发送 RESUME 信令并等待 RESUME ACK, 省去重新建立 TLS 与 websocket 连接的开销。
+          已有进行中的 resume 时只等待其 ACK。
+
+        :返回:
+
+          - ``bool``: 是否在超时前收到 RESUME ACK
+        """
+        config = self.kaiheila_config
+        if session.state is not SessionState.RESUMING_INPLACE:
+            session.resume_ack.clear()
+            session.transition(SessionState.RESUMING_INPLACE, f"sn={sn}")
+            log(
+                "INFO",
+                f"Resuming bot {escape_tag(str(session.self_id))} in place, sn: {sn}",
+            )
+            try:
+                await ws.send(json_dumps({"s": SignalTypes.RESUME.value, "sn": sn}))
             except Exception as e:
-                log(
-                    "ERROR",
-                    "<r><bg #f8bbd0>Error while sending heartbeat for bot"
-                    f"{escape_tag(bot.self_id)}. Will retry after 1s ...</bg #f8bbd0></r>",
-                    e,
-                )
-                await asyncio.sleep(1)
+                log("WARNING", "Failed to send RESUME", e)
+                return False
+
+        start = time.monotonic()
+        try:
+            await self._wait_signal(
+                session, session.resume_ack, config.kaiheila_resume_ack_timeout
+            )
+        except asyncio.TimeoutError:
+            log(
+                "WARNING",
+                f"No RESUME ACK for bot {escape_tag(str(session.self_id))} "
+                f"in {config.kaiheila_resume_ack_timeout}s, reconnecting",
+            )
+            return False
+
+        if session.state is SessionState.RESUMING_INPLACE:
+            session.transition(SessionState.CONNECTED, "resume ack")
+            log(
+                "INFO",
+                f"<y>Bot {escape_tag(str(session.self_id))}</y> resumed in place "
+                f"in {(time.monotonic() - start) * 1000:.0f}ms",
+            )
+        return True
+
+    @classmethod
+    def _frame_filter_for(cls, kaiheila_config: KaiheilaConfig) -> FrameFilter:
+        """按配置构建过滤器, 同一个配置对象只构建一次"""
+        cached = cls._config_filter
+        if cached is None or cached[0] is not kaiheila_config:
+            cached = cls._config_filter = (
+                kaiheila_config,
+                FrameFilter.from_config(kaiheila_config),
+            )
+        return cached[1]
 
     @classmethod
     def json_to_event(
@@ -389,6 +1142,7 @@ class Adapter(BaseAdapter):
         self_id: Optional[str] = None,
         *,
         kaiheila_config: KaiheilaConfig,
+        frame_filter: Optional[FrameFilter] = None,
     ) -> Union[OriginEvent, Event, None]:
         if not isinstance(json_data, dict):
             return None
@@ -401,7 +1155,7 @@ class Adapter(BaseAdapter):
                 data["post_type"] = "meta_event"
                 data["sub_type"] = "connect"
                 data["meta_event_type"] = "lifecycle"
-                return type_validate_python(LifecycleMetaEvent, data)
+                return get_validator(LifecycleMetaEvent)(data)
             elif json_data["d"]["code"] == 40103:
                 raise TokenError("token 过期")
             elif json_data["d"]["code"] == 40101:
@@ -410,17 +1164,22 @@ class Adapter(BaseAdapter):
                 raise TokenError("token 验证失败")
             elif json_data["d"]["code"] == 40100:
                 raise TokenError("缺少参数")
+            elif json_data["d"]["code"] in (40106, 40107, 40108):
+                # resume 失败, 需要重新获取网关并建立新会话
+                d = json_data["d"]
+                raise ReconnectError(d["code"], d.get("err", ""))
         elif signal == SignalTypes.PONG:
             data = {"post_type": "meta_event", "meta_event_type": "heartbeat"}
             log(
                 "TRACE",
                 f"<y>Bot {escape_tag(str(self_id))}</y> HeartBeat",
             )
-            return type_validate_python(HeartbeatMetaEvent, data)
+            return get_validator(HeartbeatMetaEvent)(data)
         elif signal == SignalTypes.EVENT:
             ResultStore.set_sn(self_id, json_data["sn"])
         elif signal == SignalTypes.RECONNECT:
-            raise ReconnectError(**json_data["d"])
+            d = json_data.get("d") or {}
+            raise ReconnectError(d.get("code", 0), d.get("err", ""))
         elif signal == SignalTypes.RESUME_ACK:
             log("INFO", "Resume success, session_id: " + json_data["d"]["session_id"])
             return ResumeAckMetaEvent(
@@ -428,10 +1187,18 @@ class Adapter(BaseAdapter):
             )
 
         # 屏蔽 Bot 自身
-        if json_data["d"].get("author_id") == self_id :
+        if json_data["d"].get("author_id") == self_id:
             return
         # 屏蔽其他Bot消息
-        if json_data["d"].get("extra", {}).get("author", {}).get("bot") and kaiheila_config.kaiheila_ignore_other_bots:
+        if (
+            json_data["d"].get("extra", {}).get("author", {}).get("bot")
+            and kaiheila_config.kaiheila_ignore_other_bots
+        ):
+            return
+        # 在解析前按服务器/频道/事件名过滤, sn 已在上面更新
+        if frame_filter is None:
+            frame_filter = cls._frame_filter_for(kaiheila_config)
+        if frame_filter and not frame_filter(json_data["d"]):
             return
         try:
             data = json_data["d"]
@@ -473,18 +1240,10 @@ class Adapter(BaseAdapter):
             sub_type = f".{sub_type}" if sub_type else ""
 
             event_name: str = post_type + detail_type + sub_type
-            if kaiheila_config.kaiheila_ignore_events and event_name.startswith(kaiheila_config.kaiheila_ignore_events):
-                return
-
-            models = cls.get_event_model(event_name)
-            for model in models:
-                try:
-                    event = type_validate_python(model, data)
-                    break
-                except Exception as e:
-                    log("DEBUG", "Event Parser Error", e)
-            else:
-                event = type_validate_python(Event, json_data)
+            if sub_type and not has_event_model(event_name):
+                # 消息的 sub_type 是内容类型 (text、kmarkdown 等), 内置 Model 不按内容类型区分
+                event_name = post_type + detail_type
+            event = cls.get_event_parser(event_name)(data)
             log("DEBUG", escape_tag(str(model_dump(event))))
             return event
         except Exception as e:
@@ -499,22 +1258,35 @@ class Adapter(BaseAdapter):
     def add_custom_model(cls, model: Type[Event]) -> None:
         if not model.__event__:
             raise ValueError("Event model's `__event__` attribute must be set")
-        cls.event_models["." + model.__event__] = model
+        event.register_event_model(model)
+        clear_validators()
 
     @classmethod
     def get_event_model(cls, event_name: str) -> List[Type[Event]]:
         """
         :说明:
 
-          根据事件名获取对应 ``Event Model`` 及 ``FallBack Event Model`` 列表, 不包括基类 ``Event``
+          根据事件名获取对应 ``Event Model`` 及 ``FallBack Event Model`` 列表
 
         :返回:
 
           - ``List[Type[Event]]``
         """
-        return [model.value for model in cls.event_models.prefixes("." + event_name)][
-            ::-1
-        ]
+        return event.get_event_model(event_name)
+
+    @classmethod
+    def get_event_parser(cls, event_name: str) -> Callable[[Any], Event]:
+        """
+        :说明:
+
+          根据事件名获取解析函数, 解析函数按 ``get_event_model`` 的顺序校验:
+          先用与事件名最接近的 ``Event Model``, 校验失败时依次退回上级事件, 最后使用基类 ``Event``
+
+        :返回:
+
+          - ``Callable[[Any], Event]``
+        """
+        return event.get_event_parser(event_name)
 
     @classmethod
     def custom_send(
@@ -0,0 +1,157 @@
+import time
+import heapq
+import random
+import asyncio
+from typing import List, Tuple, Optional, NamedTuple
+
+
+class AdmissionStats(NamedTuple):
+    """握手准入统计信息"""
+
+    active: int
+    """正在握手的连接数"""
+    waiting: int
+    """排队等待握手的连接数"""
+    max_waiting: int
+    """排队连接数的最大值"""
+    handshakes: int
+    """成功完成的握手数"""
+    failures: int
+    """失败的握手数"""
+    total_wait: float
+    """累计排队秒数"""
+    max_wait: float
+    """单次排队的最长秒数"""
+    last_latency: Optional[float]
+    """最近一次成功握手的耗时"""
+    total_latency: float
+    """成功握手的累计耗时, 除以 ``handshakes`` 即平均耗时"""
+    max_latency: float
+    """成功握手的最长耗时"""
+
+
+class AdmissionTicket:
+    """
+    :说明:
+
+      一次握手的准入凭证, 握手结束 (成功或失败) 时调用 ``release`` 归还, 重复调用无效。
+    """
+
+    __slots__ = ("_controller", "_admitted_at", "_released")
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._admitted_at = time.monotonic()
+        self._released = False
+
+    @property
+    def released(self) -> bool:
+        return self._released
+
+    def release(self, ok: bool = False) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(time.monotonic() - self._admitted_at, ok)
+
+
+class AdmissionController:
+    """
+    :说明:
+
+      多个 Bot 共享的连接准入控制, 限制同时进行的握手数
+      (获取网关、建立 websocket 连接、等待 HELLO 与获取 Bot 信息)。
+
+      握手名额用尽时按 ``weight`` 从高到低、同权重按先后顺序排队;
+      重连时先随机等待 0 到 ``jitter`` 秒, 避免网络抖动后所有 Bot 同时涌向 ``gateway/index`` 与 ``user/me``。
+
+    :参数:
+
+      * ``limit: int``: 同时进行的握手数
+      * ``jitter: float``: 重连前随机等待的最长秒数
+    """
+
+    def __init__(self, limit: int = 4, jitter: float = 1.0):
+        self.limit = max(limit, 1)
+        self.jitter = jitter
+        self._heap: List[Tuple[float, int, "asyncio.Future[None]"]] = []
+        self._seq = 0
+        self._active = 0
+        self._max_waiting = 0
+        self._handshakes = 0
+        self._failures = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_latency: Optional[float] = None
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    @property
+    def waiting(self) -> int:
+        return sum(not future.done() for _, _, future in self._heap)
+
+    def stats(self) -> AdmissionStats:
+        return AdmissionStats(
+            active=self._active,
+            waiting=self.waiting,
+            max_waiting=self._max_waiting,
+            handshakes=self._handshakes,
+            failures=self._failures,
+            total_wait=self._total_wait,
+            max_wait=self._max_wait,
+            last_latency=self._last_latency,
+            total_latency=self._total_latency,
+            max_latency=self._max_latency,
+        )
+
+    async def admit(self, weight: float = 1.0, jitter: bool = False) -> AdmissionTicket:
+        """
+        :说明:
+
+          等待握手名额, 返回准入凭证
+
+        :参数:
+
+          * ``weight: float``: 优先级, 越大越先获得名额
+          * ``jitter: bool``: 是否先随机等待一段时间, 用于重连
+        """
+        if jitter and self.jitter > 0:
+            await asyncio.sleep(random.uniform(0, self.jitter))
+
+        start = time.monotonic()
+        if self._active < self.limit and not self.waiting:
+            self._active += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._seq += 1
+            heapq.heappush(self._heap, (-weight, self._seq, future))
+            self._max_waiting = max(self._max_waiting, self.waiting)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # 已获得名额但随即被取消, 交给下一个等待者
+                    self._release(None, False)
+                raise
+
+        waited = time.monotonic() - start
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        return AdmissionTicket(self)
+
+    def _release(self, latency: Optional[float], ok: bool) -> None:
+        if ok and latency is not None:
+            self._handshakes += 1
+            self._last_latency = latency
+            self._total_latency += latency
+            self._max_latency = max(self._max_latency, latency)
+        elif latency is not None:
+            self._failures += 1
+
+        while self._heap:
+            _, _, future = heapq.heappop(self._heap)
+            if not future.done():
+                # 名额直接转交, 正在握手的连接数不变
+                future.set_result(None)
+                return
+        self._active -= 1
@@ -1,5 +1,8 @@
-from typing import Any, List, Optional, NamedTuple
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Callable, Optional, NamedTuple
 
+from ..compat import get_validator
 from .model import (
     URL,
     Role,
@@ -106,13 +109,70 @@ api_method_map = {
 }
 
 
+class Route(NamedTuple):
+    """编译后的接口路由"""
+
+    path: str
+    """接口路径, 如 ``channel-role/index``"""
+    method: str
+    """请求方法"""
+    restype: Optional[Any] = None
+    """返回值类型"""
+
+    @property
+    def validator(self) -> Optional[Callable[[Any], Any]]:
+        """返回值的校验函数, 每次从 ``get_validator`` 获取, 随 ``clear_validators`` 失效"""
+        return get_validator(self.restype) if self.restype else None
+
+
+_routes: Dict[str, Route] = {}
+_upper_case = re.compile(r"[A-Z]")
+
+
+def api_name_to_path(api: str) -> str:
+    """
+    :说明:
+
+      将 API 名称转换为接口路径, 如 ``channelRole_index`` 转换为 ``channel-role/index``
+    """
+    api = _upper_case.sub(lambda m: "-" + m.group().lower(), api)
+    api = api.replace("_", "/")
+
+    if api.startswith("/api/v3/"):
+        api = api[len("/api/v3/") :]
+    elif api.startswith("api/v3"):
+        api = api[len("api/v3") :]
+    return api.strip("/")
+
+
+def get_route(path: str) -> Route:
+    """
+    :说明:
+
+      获取接口路径对应的路由, 已知接口只编译一次; 未知接口默认为 POST 且没有返回值类型, 不做缓存
+    """
+    route = _routes.get(path)
+    if route is None:
+        if path not in api_method_map:
+            return Route(path, "POST")
+        method, restype = api_method_map[path]
+        route = _routes[path] = Route(path, method, restype)
+    return route
+
+
+@lru_cache(maxsize=1024)
+def resolve_route(api: str) -> Route:
+    """
+    :说明:
+
+      获取 API 名称 (如 ``Bot.call_api`` 的 ``api`` 参数) 对应的路由, 结果按 LRU 缓存
+    """
+    return get_route(api_name_to_path(api))
+
+
 def get_api_method(api: str) -> str:
-    if api not in api_method_map:
-        return "POST"
-    return api_method_map[api].method
+    return get_route(api).method
 
 
 def get_api_restype(api: str) -> Any:
-    if api not in api_method_map:
-        return None
-    return api_method_map[api].restype
+    return get_route(api).restype
@@ -0,0 +1,167 @@
+import hashlib
+import sqlite3
+from io import IOBase
+from os import PathLike
+from pathlib import Path
+from contextlib import closing
+from collections import OrderedDict
+from typing import Any, Union, Callable, Optional, Awaitable, NamedTuple
+
+from nonebot.utils import run_sync
+
+from .utils import log
+from .cache import SingleFlight, request_key
+
+CHUNK_SIZE = 1024 * 1024
+HASH_OFFLOAD_THRESHOLD = 1024 * 1024
+"""超过该字节数的数据在线程池中计算摘要"""
+
+
+def _hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hash_path(path: Union[str, "PathLike[str]"]) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _hash_stream(stream: IOBase) -> str:
+    sha256 = hashlib.sha256()
+    position = stream.tell()
+    try:
+        while chunk := stream.read(CHUNK_SIZE):
+            sha256.update(chunk)
+    finally:
+        stream.seek(position)
+    return sha256.hexdigest()
+
+
+class AssetCacheStats(NamedTuple):
+    """上传缓存统计信息"""
+
+    hits: int
+    """命中缓存, 跳过上传的次数"""
+    misses: int
+    size: int
+    """内存中的条目数"""
+
+
+class AssetCache:
+    """
+    :说明:
+
+      以文件内容的 SHA-256 摘要为键缓存 ``asset/create`` 返回的 URL, 相同内容重复发送时不再上传。
+
+      内存中按 LRU 保留 ``max_size`` 条; 指定 ``path`` 时同时写入 SQLite 索引, 重启后仍然有效。
+      大文件与文件路径在线程池中计算摘要, 同一内容的并发上传只会发出一次请求。
+
+    :参数:
+
+      * ``max_size: int``: 内存中最多保留的条目数
+      * ``path: Optional[Path]``: SQLite 索引文件路径, 为 None 时仅保存在内存中
+    """
+
+    def __init__(self, max_size: int = 256, path: Optional[Path] = None):
+        self.max_size = max_size
+        self.path = Path(path) if path is not None else None
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS asset (digest TEXT PRIMARY KEY, url TEXT)"
+                )
+
+    def stats(self) -> AssetCacheStats:
+        return AssetCacheStats(
+            hits=self.hits, misses=self.misses, size=len(self._entries)
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def _read(self, digest: str) -> Optional[str]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT url FROM asset WHERE digest = ?", (digest,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _write(self, digest: str, url: str) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO asset (digest, url) VALUES (?, ?)",
+                (digest, url),
+            )
+
+    async def digest(self, file: Any) -> Optional[str]:
+        """
+        :说明:
+
+          计算待上传内容的摘要, 不可重复读取的文件流返回 None
+        """
+        if isinstance(file, bytes):
+            if len(file) > HASH_OFFLOAD_THRESHOLD:
+                return await run_sync(_hash_bytes)(file)
+            return _hash_bytes(file)
+        if isinstance(file, (str, PathLike)):
+            return await run_sync(_hash_path)(file)
+        if isinstance(file, IOBase) and file.seekable():
+            return await run_sync(_hash_stream)(file)
+        return None
+
+    def _remember(self, digest: str, url: str) -> None:
+        self._entries[digest] = url
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def get(self, digest: str) -> Optional[str]:
+        url = self._entries.get(digest)
+        if url is not None:
+            self._entries.move_to_end(digest)
+            return url
+        if self.path is not None:
+            url = await run_sync(self._read)(digest)
+            if url is not None:
+                self._remember(digest, url)
+        return url
+
+    async def set(self, digest: str, url: str) -> None:
+        self._remember(digest, url)
+        if self.path is not None:
+            try:
+                await run_sync(self._write)(digest, url)
+            except Exception as e:
+                log("WARNING", f"Failed to write asset index {self.path}", e)
+
+    async def get_or_upload(
+        self, digest: str, upload: Callable[[], Awaitable[str]]
+    ) -> str:
+        """
+        :说明:
+
+          返回缓存的 URL, 未命中时调用 ``upload`` 上传并记录结果
+        """
+        url = await self.get(digest)
+        if url is not None:
+            self.hits += 1
+            log("DEBUG", f"Asset {digest[:12]} already uploaded, reusing {url}")
+            return url
+        self.misses += 1
+
+        async def upload_and_remember() -> str:
+            url = await upload()
+            await self.set(digest, url)
+            return url
+
+        return await self._inflight.do(
+            request_key("", "asset/create", {"sha256": digest}), upload_and_remember
+        )
@@ -1,15 +1,32 @@
-from pathlib import Path
-from io import BytesIO, BufferedReader
+import os
+import time
+from os import PathLike
+from io import IOBase, BytesIO
 from typing_extensions import override
-from typing import TYPE_CHECKING, Any, Union, Literal, BinaryIO, Callable, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Union,
+    Literal,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Optional,
+    MutableSet,
+    AsyncIterator,
+)
 
+from nonebot.utils import run_sync
 from nonebot.message import handle_event
 
 from nonebot.adapters import Bot as BaseBot
 
+from .outbox import Outbox
 from .event import Event, MessageEvent
-from .utils import log, escape_kmarkdown
-from .api import ApiClient, MessageCreateReturn
+from .utils import BytesReadable, log, escape_kmarkdown
+from .broadcast import BroadcastResult, BroadcastTarget, broadcast
+from .paginate import DEFAULT_PAGE_SIZE, DEFAULT_CONCURRENCY, paginate
 from .message import (
     Text,
     Mention,
@@ -18,10 +35,19 @@ from .message import (
     MessageSegment,
     MessageSerializer,
 )
+from .api import (
+    Role,
+    User,
+    Guild,
+    Invite,
+    Channel,
+    UserChat,
+    ApiClient,
+    BlackList,
+    MessageCreateReturn,
+)
 
 if TYPE_CHECKING:
-    from os import PathLike
-
     from .adapter import Adapter
 
 
@@ -119,6 +145,18 @@ def _check_nickname(bot: "Bot", event: MessageEvent):
                 break
 
 
+def _upload_size(file: Union[bytes, IOBase]) -> Optional[int]:
+    """待上传的字节数, 无法得知时返回 None"""
+    if isinstance(file, bytes):
+        return len(file)
+    if isinstance(file, BytesIO):
+        return file.getbuffer().nbytes - file.tell()
+    try:
+        return os.fstat(file.fileno()).st_size - file.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+
 async def send(
     bot: "Bot",
     event: Event,
@@ -162,6 +200,8 @@ class Bot(BaseBot, ApiClient):
     Kaiheila Bot 适配。
     """
 
+    adapter: "Adapter"
+
     send_handler: Callable[
         ["Bot", Event, Union[str, Message, MessageSegment], bool, bool], Any
     ] = send
@@ -179,6 +219,16 @@ class Bot(BaseBot, ApiClient):
         super().__init__(adapter, self_id)
         self.self_name: str = name
         self.token: str = token
+        config = adapter.kaiheila_config
+        self.outbox: Optional[Outbox] = (
+            Outbox(
+                self,
+                coalesce_window=config.kaiheila_send_coalesce_window,
+                slow_mode=config.kaiheila_send_slow_mode,
+            )
+            if config.kaiheila_send_queue
+            else None
+        )
 
     @override
     async def call_api(self, api: str, **data) -> Any:
@@ -320,19 +370,14 @@ class Bot(BaseBot, ApiClient):
             channel_id: 频道ID（消息类型为 `channel`、`temp` 时需要）
             message: 要发送的内容，字符串类型将作为纯文本消息发送
             quote: 回复某条消息的消息ID
+
+        开启 ``kaiheila_send_queue`` 时，消息进入该目标的发送队列，按顺序发送完成后返回。
         """
         # 接口文档：
         # https://developer.kaiheila.cn/doc/http/direct-message#%E5%8F%91%E9%80%81%E7%A7%81%E4%BF%A1%E8%81%8A%E5%A4%A9%E6%B6%88%E6%81%AF
         # https://developer.kaiheila.cn/doc/http/message#%E5%8F%91%E9%80%81%E9%A2%91%E9%81%93%E8%81%8A%E5%A4%A9%E6%B6%88%E6%81%AF
         params = {}
 
-        # type & content
-        if isinstance(message, Message):
-            serialized_data = await MessageSerializer(message).serialize(self)
-        else:
-            serialized_data = await MessageSerializer(Message(message)).serialize(self)
-        params = {**params, **serialized_data}
-
         # quote
         if quote is not None:
             params["quote"] = quote
@@ -362,16 +407,65 @@ class Bot(BaseBot, ApiClient):
             else:
                 raise ValueError("channel_id 和 user_id 不能同时为 None")
 
-        return await self.call_api(api, **params)
+        if not isinstance(message, Message):
+            message = Message(message)
+        if self.outbox is not None:
+            return await self.outbox.put(api, params, message)
+        return await self._send_message(api, params, message)
+
+    async def _send_message(
+        self, api: str, params: Dict[str, Any], message: Message
+    ) -> MessageCreateReturn:
+        # type & content, 显式传入的 quote 优先于消息中的引用
+        serialized_data = await MessageSerializer(message).serialize(self)
+        return await self.call_api(api, **{**serialized_data, **params})
+
+    def broadcast(
+        self,
+        message: Union[str, Message, MessageSegment],
+        targets: Iterable[BroadcastTarget],
+        *,
+        done: Optional[MutableSet[BroadcastTarget]] = None,
+        concurrency: int = 4,
+    ) -> AsyncIterator[BroadcastResult]:
+        """
+        :说明:
+
+          将同一条消息发送给多个频道或用户, 消息只序列化一次, 按完成顺序产出各目标的结果。
+
+        :参数:
+
+          * ``message``: 要发送的消息
+          * ``targets: Iterable[BroadcastTarget]``: 发送目标
+          * ``done: Optional[MutableSet[BroadcastTarget]]``: 已发送成功的目标, 用于中断后继续
+          * ``concurrency: int``: 每个限速 bucket 同时发送的消息数
+
+        :示例:
+
+        .. code-block:: python
+
+            done = set()
+            targets = [BroadcastTarget.channel(cid) for cid in channel_ids]
+            async for r in bot.broadcast("公告", targets, done=done):
+                if not r.ok:
+                    logger.warning(f"{r.target} 发送失败: {r.exception}")
+        """
+        return broadcast(self, message, targets, done, concurrency)
 
     async def upload_file(
         self,
-        file: Union[str, "PathLike[str]", BinaryIO, bytes],
+        file: Union[str, "PathLike[str]", BinaryIO, BytesReadable, bytes],
         filename: Optional[str] = None,
     ) -> str:
         """
         上传文件。
 
+        文件路径在线程池中打开; 可定位的文件流先回到开头,
+        再交由驱动器分块读取并以 multipart 形式发送, 内存占用与分块大小相当;
+        不可定位的流与只实现了 ``read()`` 的对象在线程池中一次性读取。
+        aiohttp 驱动器在线程池中读取文件流, httpx 驱动器则在事件循环中同步读取。
+        开启上传缓存时, 内容相同的文件只上传一次, 之后直接返回缓存的 URL。
+
         参数:
             file: 文件，可以是文件路径（str, PathLike[str]）、打开的文件流（BinaryIO）、或二进制数据（bytes）
             filename: 文件名
@@ -379,14 +473,188 @@ class Bot(BaseBot, ApiClient):
         返回值:
             文件的 URL
         """
-        if isinstance(file, BytesIO):
-            file = file.getvalue()
-        elif isinstance(file, BufferedReader):
-            file = file.read()
-        elif isinstance(file, str) or isinstance(file, Path):
-            with open(file, "rb") as img:
-                file = img.read()
-        # 经过测试，服务器会用从文件读取到的mime覆盖掉我们传过去的mime
-        file = (filename or "upload-file", file, "application/octet-stream")
-        result = await self.asset_create(file=file)
+        if isinstance(file, IOBase) and file.seekable():
+            # 上传整个文件, 同一个流重复发送时也不会只剩下未读取的部分
+            file.seek(0)
+        elif not isinstance(file, (str, PathLike, bytes)):
+            file = await run_sync(file.read)()
+
+        cache = self.adapter.asset_cache
+        digest = await cache.digest(file) if cache is not None else None
+        if digest is None:
+            return await self._upload_asset(file, filename)
+        return await cache.get_or_upload(
+            digest, lambda: self._upload_asset(file, filename)
+        )
+
+    async def _upload_asset(
+        self,
+        file: Union[str, "PathLike[str]", IOBase, bytes],
+        filename: Optional[str],
+    ) -> str:
+        opened = None
+        if isinstance(file, (str, PathLike)):
+            file = opened = await run_sync(open)(file, "rb")
+
+        size = _upload_size(file)
+        start = time.monotonic()
+        try:
+            # 经过测试，服务器会用从文件读取到的mime覆盖掉我们传过去的mime
+            result = await self.asset_create(
+                file=(filename or "upload-file", file, "application/octet-stream")
+            )
+        finally:
+            if opened is not None:
+                await run_sync(opened.close)()
+
+        elapsed = time.monotonic() - start
+        if size is not None:
+            log(
+                "DEBUG",
+                f"Uploaded {size} bytes in {elapsed:.3f}s "
+                f"({size / max(elapsed, 1e-6) / 1024 / 1024:.2f} MiB/s)",
+            )
+        else:
+            log("DEBUG", f"Uploaded file in {elapsed:.3f}s")
         return result.url
+
+    def iter_guilds(
+        self,
+        *,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        **params: Any,
+    ) -> AsyncIterator[Guild]:
+        """
+        :说明:
+
+          遍历机器人加入的服务器, 自动翻页并预取后续页面。
+
+        :参数:
+
+          * ``page_size: int``: 每页数量
+          * ``concurrency: int``: 最多同时拉取的页数
+          * ``**params``: ``guild/list`` 的其余参数
+
+        :示例:
+
+        .. code-block:: python
+
+            async for guild in bot.iter_guilds():
+                ...
+        """
+        return paginate(self, "guild_list", "guilds", params, page_size, concurrency)
+
+    def iter_guild_users(
+        self,
+        *,
+        guild_id: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        **params: Any,
+    ) -> AsyncIterator[User]:
+        """
+        :说明:
+
+          遍历服务器中的用户, 自动翻页并预取后续页面, ``**params`` 为 ``guild/user-list`` 的其余参数
+        """
+        return paginate(
+            self,
+            "guild_userList",
+            "users",
+            {"guild_id": guild_id, **params},
+            page_size,
+            concurrency,
+        )
+
+    def iter_channels(
+        self,
+        *,
+        guild_id: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        **params: Any,
+    ) -> AsyncIterator[Channel]:
+        """
+        :说明:
+
+          遍历服务器中的频道, 自动翻页并预取后续页面, ``**params`` 为 ``channel/list`` 的其余参数
+        """
+        return paginate(
+            self,
+            "channel_list",
+            "channels",
+            {"guild_id": guild_id, **params},
+            page_size,
+            concurrency,
+        )
+
+    def iter_blacklist(
+        self,
+        *,
+        guild_id: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> AsyncIterator[BlackList]:
+        """
+        :说明:
+
+          遍历服务器的黑名单, 自动翻页并预取后续页面
+        """
+        return paginate(
+            self,
+            "blacklist_list",
+            "blacklists",
+            {"guild_id": guild_id},
+            page_size,
+            concurrency,
+        )
+
+    def iter_invites(
+        self,
+        *,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        **params: Any,
+    ) -> AsyncIterator[Invite]:
+        """
+        :说明:
+
+          遍历服务器或频道的邀请, 自动翻页并预取后续页面, ``**params`` 为 ``invite/list`` 的参数
+        """
+        # InvitesReturn 的列表字段名为 roles
+        return paginate(self, "invite_list", "roles", params, page_size, concurrency)
+
+    def iter_guild_roles(
+        self,
+        *,
+        guild_id: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> AsyncIterator[Role]:
+        """
+        :说明:
+
+          遍历服务器的角色, 自动翻页并预取后续页面
+        """
+        return paginate(
+            self,
+            "guildRole_list",
+            "roles",
+            {"guild_id": guild_id},
+            page_size,
+            concurrency,
+        )
+
+    def iter_user_chats(
+        self,
+        *,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> AsyncIterator[UserChat]:
+        """
+        :说明:
+
+          遍历私信聊天会话, 自动翻页并预取后续页面
+        """
+        return paginate(self, "userChat_list", "user_chats", {}, page_size, concurrency)
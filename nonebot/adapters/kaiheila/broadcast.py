@@ -0,0 +1,121 @@
+import asyncio
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Deque,
+    Union,
+    Literal,
+    Iterable,
+    Optional,
+    MutableSet,
+    NamedTuple,
+    AsyncIterator,
+)
+
+from .api import MessageCreateReturn
+from .message import Message, MessageSegment, MessageSerializer
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+_apis = {"channel": "message_create", "private": "directMessage_create"}
+
+
+class BroadcastTarget(NamedTuple):
+    """广播目标"""
+
+    message_type: Literal["channel", "private"]
+    target_id: str
+    """频道 ID 或用户 ID"""
+
+    @classmethod
+    def channel(cls, channel_id: str) -> "BroadcastTarget":
+        return cls("channel", channel_id)
+
+    @classmethod
+    def private(cls, user_id: str) -> "BroadcastTarget":
+        return cls("private", user_id)
+
+
+class BroadcastResult(NamedTuple):
+    """单个目标的发送结果"""
+
+    target: BroadcastTarget
+    result: Optional[MessageCreateReturn]
+    exception: Optional[Exception]
+
+    @property
+    def ok(self) -> bool:
+        return self.exception is None
+
+
+async def broadcast(
+    bot: "Bot",
+    message: Union[str, Message, MessageSegment],
+    targets: Iterable[BroadcastTarget],
+    done: Optional[MutableSet[BroadcastTarget]] = None,
+    concurrency: int = 4,
+) -> AsyncIterator[BroadcastResult]:
+    """
+    :说明:
+
+      将同一条消息发送给多个频道或用户, 按完成顺序逐个产出各目标的结果。
+
+      消息只序列化一次 (包括上传本地媒体与转换卡片消息), 之后每个目标复用同一份参数。
+      频道消息与私信分属不同的限速 bucket, 各自由 ``concurrency`` 个协程发送,
+      一个 bucket 额度用尽时不影响另一个。发送失败不会中断广播, 异常记录在结果中。
+
+      传入 ``done`` 时跳过其中的目标, 并在每个目标发送成功后将其加入 ``done``;
+      中断后以同一个集合重新调用即可从断点继续。提前结束迭代时取消未完成的发送。
+
+    :参数:
+
+      * ``bot: Bot``: Bot 对象
+      * ``message``: 要发送的消息
+      * ``targets: Iterable[BroadcastTarget]``: 发送目标
+      * ``done: Optional[MutableSet[BroadcastTarget]]``: 已发送成功的目标
+      * ``concurrency: int``: 每个 bucket 同时发送的消息数
+    """
+    groups: Dict[str, Deque[BroadcastTarget]] = {}
+    for target in targets:
+        if done is not None and target in done:
+            continue
+        groups.setdefault(_apis[target.message_type], deque()).append(target)
+    total = sum(len(queue) for queue in groups.values())
+    if not total:
+        return
+
+    if not isinstance(message, Message):
+        message = Message(message)
+    payload: Dict[str, Any] = await MessageSerializer(message).serialize(bot)
+
+    concurrency = max(concurrency, 1)
+    results: "asyncio.Queue[BroadcastResult]" = asyncio.Queue(concurrency * len(groups))
+
+    async def worker(api: str, queue: Deque[BroadcastTarget]) -> None:
+        while queue:
+            target = queue.popleft()
+            try:
+                result = await bot.call_api(
+                    api, **{**payload, "target_id": target.target_id}
+                )
+            except Exception as e:
+                await results.put(BroadcastResult(target, None, e))
+            else:
+                if done is not None:
+                    done.add(target)
+                await results.put(BroadcastResult(target, result, None))
+
+    workers = [
+        asyncio.create_task(worker(api, queue))
+        for api, queue in groups.items()
+        for _ in range(min(concurrency, len(queue)))
+    ]
+    try:
+        for _ in range(total):
+            yield await results.get()
+    finally:
+        for task in workers:
+            task.cancel()
@@ -0,0 +1,247 @@
+import time
+import asyncio
+from collections import OrderedDict
+from typing import (
+    Any,
+    Set,
+    Dict,
+    List,
+    Tuple,
+    Mapping,
+    TypeVar,
+    Callable,
+    Optional,
+    Awaitable,
+    NamedTuple,
+)
+
+from .utils import log
+from .filter import raw_event_name
+
+DEFAULT_TTLS: Dict[str, float] = {
+    "user/view": 300,
+    "guild/view": 300,
+    "channel/view": 300,
+    "guild-role/list": 300,
+    "channel-role/index": 300,
+}
+"""默认缓存的接口及缓存秒数"""
+
+T = TypeVar("T")
+
+CacheKey = Tuple[str, str, Tuple[Tuple[str, str], ...]]
+IndexKey = Tuple[str, str, str]
+
+
+def request_key(token: str, route: str, params: Mapping[str, Any]) -> CacheKey:
+    """由 (token, 接口, 参数) 生成请求的键, 参数顺序不影响结果"""
+    return (
+        token,
+        route,
+        tuple(sorted((name, str(value)) for name, value in params.items())),
+    )
+
+
+def _target_id(d: Dict[str, Any]) -> Optional[str]:
+    return d.get("target_id")
+
+
+def _body(key: str) -> Callable[[Dict[str, Any]], Optional[str]]:
+    def get(d: Dict[str, Any]) -> Optional[str]:
+        value = ((d.get("extra") or {}).get("body") or {}).get(key)
+        return str(value) if value is not None else None
+
+    return get
+
+
+_guild = ("guild/view", "guild_id", _target_id)
+_guild_roles = ("guild-role/list", "guild_id", _target_id)
+_channel = ("channel/view", "target_id", _body("id"))
+_channel_roles = ("channel-role/index", "channel_id", _body("id"))
+_member = ("user/view", "user_id", _body("user_id"))
+
+# 事件名 -> [(接口, 参数名, 取参数值的函数)], 收到事件时使对应的缓存失效
+_invalidation_rules: Dict[
+    str, List[Tuple[str, str, Callable[[Dict[str, Any]], Optional[str]]]]
+] = {
+    "notice.updated_guild": [_guild],
+    "notice.deleted_guild": [_guild, _guild_roles],
+    "notice.self_exited_guild": [
+        ("guild/view", "guild_id", _body("guild_id")),
+        ("guild-role/list", "guild_id", _body("guild_id")),
+    ],
+    "notice.added_role": [_guild, _guild_roles],
+    "notice.deleted_role": [_guild, _guild_roles],
+    "notice.updated_role": [_guild, _guild_roles],
+    "notice.added_channel": [_guild],
+    "notice.updated_channel": [_guild, _channel, _channel_roles],
+    "notice.deleted_channel": [_guild, _channel, _channel_roles],
+    "notice.user_updated": [_member],
+    "notice.updated_guild_member": [_member],
+    "notice.joined_guild": [_member],
+    "notice.exited_guild": [_member],
+}
+
+
+class CacheStats(NamedTuple):
+    """缓存统计信息"""
+
+    hits: int
+    misses: int
+    evictions: int
+    """因容量或过期被移除的条目数"""
+    invalidations: int
+    """因事件失效的条目数"""
+    size: int
+
+
+class ResponseCache:
+    """
+    :说明:
+
+      GET 接口的响应缓存。
+
+      以 (token, 接口, 参数) 为键缓存未经校验的返回数据, 每次命中都重新校验, 调用方拿到的是各自的对象。
+      每个接口有独立的过期时间, 总条目数超过 ``max_size`` 时按 LRU 淘汰;
+      收到服务器/频道/角色/用户更新等通知事件时, 按参数精确地使相关条目失效。
+
+    :参数:
+
+      * ``ttls: Mapping[str, float]``: 接口 -> 缓存秒数, 未列出或为 0 的接口不缓存
+      * ``max_size: int``: 最多缓存的条目数
+    """
+
+    def __init__(self, ttls: Mapping[str, float], max_size: int = 1024):
+        self.ttls = {route: ttl for route, ttl in ttls.items() if ttl > 0}
+        self.max_size = max_size
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._index: Dict[IndexKey, Set[CacheKey]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            invalidations=self.invalidations,
+            size=len(self._entries),
+        )
+
+    def cacheable(self, route: str) -> bool:
+        return route in self.ttls
+
+    def get(self, key: CacheKey) -> Tuple[bool, Any]:
+        """返回 (是否命中, 缓存的数据)"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self._remove(key)
+            self.evictions += 1
+        self.misses += 1
+        return False, None
+
+    def set(self, key: CacheKey, value: Any) -> None:
+        route = key[1]
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttls[route], value)
+        for name, param in key[2]:
+            self._index.setdefault((route, name, param), set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+        for name, param in key[2]:
+            keys = self._index.get((key[1], name, param))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[(key[1], name, param)]
+
+    def invalidate(self, route: str, param: str, value: str) -> int:
+        """使所有 Bot 中参数 ``param`` 为 ``value`` 的 ``route`` 缓存失效"""
+        keys = self._index.get((route, param, value))
+        if not keys:
+            return 0
+        keys = list(keys)
+        for key in keys:
+            self._remove(key)
+        self.invalidations += len(keys)
+        return len(keys)
+
+    def invalidate_frame(self, d: Dict[str, Any]) -> None:
+        """
+        :说明:
+
+          根据未经处理的事件 ``d`` 字段使相关缓存失效。
+          在过滤与解析之前调用, 被过滤掉的事件同样会使缓存失效。
+        """
+        rules = _invalidation_rules.get(raw_event_name(d))
+        if not rules:
+            return
+        for route, param, get_value in rules:
+            value = get_value(d)
+            if value is not None and self.invalidate(route, param, value):
+                log("DEBUG", f"Cache of <y>{route}</y> {param}={value} invalidated")
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._index.clear()
+
+
+class SingleFlightStats(NamedTuple):
+    """请求合并统计信息"""
+
+    leaders: int
+    """实际发出的请求数"""
+    shared: int
+    """复用进行中请求结果的调用数"""
+    in_flight: int
+
+
+class SingleFlight:
+    """
+    :说明:
+
+      合并并发的相同请求: 同一个键同时只有一个请求在进行, 其余调用等待并共享它的结果。
+
+      请求在独立的任务中执行, 发起请求的调用被取消时不会影响其他等待者。
+      请求结束后立即移除, 不做任何缓存。
+    """
+
+    def __init__(self):
+        self._calls: Dict[CacheKey, "asyncio.Future[Any]"] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(
+            leaders=self.leaders, shared=self.shared, in_flight=len(self._calls)
+        )
+
+    async def do(self, key: CacheKey, call: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.shared += 1
+            log("TRACE", f"API <y>{key[1]}</y> joined an in-flight request")
+        return await asyncio.shield(task)
+
+    def _done(self, key: CacheKey, task: "asyncio.Future[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # 所有等待者都已取消时, 避免 "exception was never retrieved"
+            task.exception()
@@ -0,0 +1,240 @@
+import os
+import json
+import asyncio
+import hashlib
+import sqlite3
+from pathlib import Path
+from contextlib import closing
+from abc import ABC, abstractmethod
+from typing import Dict, Union, Optional, NamedTuple
+from urllib.parse import urlsplit, parse_qsl, urlencode, urlunsplit
+
+from nonebot.utils import run_sync
+
+from .utils import log
+
+CheckpointKey = str
+
+
+class Checkpoint(NamedTuple):
+    """网关会话断点"""
+
+    self_id: str
+    """机器人 ID"""
+    session_id: str
+    """网关会话 ID"""
+    sn: int
+    """已处理的最新 sn"""
+    gateway_url: str
+    """网关地址, 保存时去掉其中的 token, 读取时补回"""
+
+
+def checkpoint_key(token: str) -> CheckpointKey:
+    """断点以 token 的摘要作为键, 避免 token 明文落盘"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _replace_token(url: str, token: Optional[str]) -> str:
+    """去掉网关地址中的 ``token`` 参数, ``token`` 不为 ``None`` 时以其替换"""
+    if not url:
+        return url
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != "token"]
+    if token is not None:
+        query.append(("token", token))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class CheckpointStore(ABC):
+    """
+    :说明:
+
+      网关会话断点存储的基类。
+
+      ``save`` 与 ``delete`` 只记录最新状态, 并在 ``interval`` 秒后合并为一次写入,
+      写入在线程池中进行, 不会阻塞事件循环。子类只需实现同步的 ``_read`` 与 ``_write``。
+
+    :参数:
+
+      * ``interval: float``: 合并写入的间隔
+    """
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._dirty: Dict[CheckpointKey, Optional[Checkpoint]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+    async def load(self, token: str) -> Optional[Checkpoint]:
+        key = checkpoint_key(token)
+        if key in self._dirty:
+            checkpoint = self._dirty[key]
+        else:
+            checkpoint = await run_sync(self._read)(key)
+        if checkpoint is None:
+            return None
+        return checkpoint._replace(
+            gateway_url=_replace_token(checkpoint.gateway_url, token)
+        )
+
+    def save(self, token: str, checkpoint: Checkpoint) -> None:
+        self._dirty[checkpoint_key(token)] = checkpoint._replace(
+            gateway_url=_replace_token(checkpoint.gateway_url, None)
+        )
+        self._schedule_flush()
+
+    def delete(self, token: str) -> None:
+        self._dirty[checkpoint_key(token)] = None
+        self._schedule_flush()
+
+    async def flush(self) -> None:
+        # 定时写入与停机/移除 Bot 时的写入可能同时发生, 逐个进行
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            pending, self._dirty = self._dirty, {}
+            if pending:
+                await run_sync(self._write)(pending)
+
+    async def close(self) -> None:
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self.interval)
+        try:
+            await self.flush()
+        except Exception as e:
+            log("ERROR", "<r><bg #f8bbd0>Failed to save checkpoint</bg #f8bbd0></r>", e)
+
+    @abstractmethod
+    def _read(self, key: CheckpointKey) -> Optional[Checkpoint]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _write(self, pending: Dict[CheckpointKey, Optional[Checkpoint]]) -> None:
+        raise NotImplementedError
+
+
+class MemoryCheckpointStore(CheckpointStore):
+    """仅保存在内存中的断点存储, 进程重启后失效; 直接读写字典, 不经过线程池"""
+
+    def __init__(self):
+        super().__init__(0.0)
+        self._data: Dict[CheckpointKey, Checkpoint] = {}
+
+    async def load(self, token: str) -> Optional[Checkpoint]:
+        return self._data.get(checkpoint_key(token))
+
+    def save(self, token: str, checkpoint: Checkpoint) -> None:
+        self._data[checkpoint_key(token)] = checkpoint
+
+    def delete(self, token: str) -> None:
+        self._data.pop(checkpoint_key(token), None)
+
+    def _read(self, key: CheckpointKey) -> Optional[Checkpoint]:
+        return self._data.get(key)
+
+    def _write(self, pending: Dict[CheckpointKey, Optional[Checkpoint]]) -> None:
+        for key, checkpoint in pending.items():
+            if checkpoint is None:
+                self._data.pop(key, None)
+            else:
+                self._data[key] = checkpoint
+
+
+class FileCheckpointStore(CheckpointStore):
+    """以 JSON 文件保存的断点存储"""
+
+    def __init__(self, path: Union[str, Path], interval: float = 1.0):
+        super().__init__(interval)
+        self._data: Dict[CheckpointKey, Checkpoint] = {}
+        self.path = Path(path)
+        if self.path.exists():
+            try:
+                raw = json.loads(self.path.read_text(encoding="utf-8"))
+                self._data = {key: Checkpoint(**value) for key, value in raw.items()}
+            except Exception as e:
+                log(
+                    "WARNING",
+                    f"Failed to load checkpoint file {self.path}, ignored",
+                    e,
+                )
+
+    def _read(self, key: CheckpointKey) -> Optional[Checkpoint]:
+        return self._data.get(key)
+
+    def _write(self, pending: Dict[CheckpointKey, Optional[Checkpoint]]) -> None:
+        for key, checkpoint in pending.items():
+            if checkpoint is None:
+                self._data.pop(key, None)
+            else:
+                self._data[key] = checkpoint
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({key: value._asdict() for key, value in self._data.items()}, f)
+        os.replace(tmp_path, self.path)
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """以 SQLite 数据库保存的断点存储"""
+
+    def __init__(self, path: Union[str, Path], interval: float = 1.0):
+        super().__init__(interval)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            # 与 JSON 文件一致, 仅允许当前用户读写
+            os.close(os.open(self.path, os.O_WRONLY | os.O_CREAT, 0o600))
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoint ("
+                "key TEXT PRIMARY KEY, self_id TEXT, session_id TEXT, "
+                "sn INTEGER, gateway_url TEXT)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    def _read(self, key: CheckpointKey) -> Optional[Checkpoint]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT self_id, session_id, sn, gateway_url "
+                "FROM checkpoint WHERE key = ?",
+                (key,),
+            ).fetchone()
+        return Checkpoint(*row) if row else None
+
+    def _write(self, pending: Dict[CheckpointKey, Optional[Checkpoint]]) -> None:
+        with closing(self._connect()) as conn, conn:
+            for key, checkpoint in pending.items():
+                if checkpoint is None:
+                    conn.execute("DELETE FROM checkpoint WHERE key = ?", (key,))
+                else:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO checkpoint VALUES (?, ?, ?, ?, ?)",
+                        (key, *checkpoint),
+                    )
+
+
+def create_checkpoint_store(
+    path: Optional[Path], interval: float = 1.0
+) -> CheckpointStore:
+    """
+    :说明:
+
+      根据配置创建断点存储: 未配置路径时仅保存在内存中,
+      路径后缀为 ``.db`` / ``.sqlite`` / ``.sqlite3`` 时使用 SQLite, 否则使用 JSON 文件。
+    """
+    if path is None:
+        return MemoryCheckpointStore()
+    if path.suffix in (".db", ".sqlite", ".sqlite3"):
+        return SQLiteCheckpointStore(path, interval)
+    return FileCheckpointStore(path, interval)
@@ -0,0 +1,82 @@
+import zlib
+from typing import Union, NamedTuple
+
+from nonebot.utils import run_sync
+
+from .utils import log
+
+
+class DecompressStats(NamedTuple):
+    """解压统计信息"""
+
+    frames: int
+    """处理的消息帧数"""
+    compressed_bytes: int
+    """收到的字节数"""
+    uncompressed_bytes: int
+    """解压后的字节数"""
+
+    @property
+    def ratio(self) -> float:
+        """压缩率, 即收到的字节数 / 解压后的字节数"""
+        if not self.uncompressed_bytes:
+            return 1.0
+        return self.compressed_bytes / self.uncompressed_bytes
+
+
+class FrameDecompressor:
+    """
+    :说明:
+
+      单个 websocket 连接的解压器。
+
+      复用预先初始化好的 ``zlib.decompressobj``: 服务端逐帧独立压缩时, 每帧结束后从模板复制出新的解压状态;
+      若数据流跨帧连续, 则一直沿用同一个解压状态。超过 ``offload_threshold`` 字节的帧在线程池中解压,
+      避免阻塞事件循环。
+
+    :参数:
+
+      * ``compress: bool``: 是否开启了压缩
+      * ``offload_threshold: int``: 放入线程池解压的最小帧大小
+    """
+
+    def __init__(self, compress: bool, offload_threshold: int = 64 * 1024):
+        self.compress = compress
+        self.offload_threshold = offload_threshold
+        self._template = zlib.decompressobj()
+        self._stream = self._template.copy()
+        self.frames = 0
+        self.compressed_bytes = 0
+        self.uncompressed_bytes = 0
+
+    def stats(self) -> DecompressStats:
+        return DecompressStats(
+            frames=self.frames,
+            compressed_bytes=self.compressed_bytes,
+            uncompressed_bytes=self.uncompressed_bytes,
+        )
+
+    def _decompress(self, data: bytes) -> bytes:
+        result = self._stream.decompress(data)
+        if self._stream.eof:
+            self._stream = self._template.copy()
+        return result
+
+    async def decompress(self, data: Union[str, bytes]) -> Union[str, bytes]:
+        if not self.compress or isinstance(data, str):
+            size = len(data)
+            self.frames += 1
+            self.compressed_bytes += size
+            self.uncompressed_bytes += size
+            return data
+
+        if len(data) >= self.offload_threshold:
+            result = await run_sync(self._decompress)(data)
+        else:
+            result = self._decompress(data)
+
+        self.frames += 1
+        self.compressed_bytes += len(data)
+        self.uncompressed_bytes += len(result)
+        log("TRACE", f"Frame decompressed: {len(data)} -> {len(result)} bytes")
+        return result
@@ -1,14 +1,24 @@
-from typing import Literal, overload
+from typing import Any, Dict, Type, Literal, TypeVar, Callable, overload
 
+from pydantic import BaseModel
 from nonebot.compat import PYDANTIC_V2
 
-__all__ = ("model_validator",)
+__all__ = ("model_validator", "get_validator", "clear_validators")
+
+T = TypeVar("T")
 
 
 if PYDANTIC_V2:
+    from pydantic import TypeAdapter
     from pydantic import model_validator as model_validator
+
+    def _build_validator(type_: Any) -> Callable[[Any], Any]:
+        if isinstance(type_, type) and issubclass(type_, BaseModel):
+            return type_.model_validate
+        return TypeAdapter(type_).validate_python
+
 else:
-    from pydantic import root_validator
+    from pydantic import parse_obj_as, root_validator
 
     @overload
     def model_validator(*, mode: Literal["before"]):
@@ -20,3 +30,40 @@ else:
 
     def model_validator(*, mode: Literal["before", "after"]):
         return root_validator(pre=mode == "before", allow_reuse=True)
+
+    def _build_validator(type_: Any) -> Callable[[Any], Any]:
+        if isinstance(type_, type) and issubclass(type_, BaseModel):
+            return type_.parse_obj
+        return lambda data: parse_obj_as(type_, data)
+
+
+_validators: Dict[Any, Callable[[Any], Any]] = {}
+
+
+@overload
+def get_validator(type_: Type[T]) -> Callable[[Any], T]:
+    ...
+
+
+@overload
+def get_validator(type_: Any) -> Callable[[Any], Any]:
+    ...
+
+
+def get_validator(type_: Any) -> Callable[[Any], Any]:
+    """
+    :说明:
+
+      获取类型的校验函数, 每个类型只构建一次。
+
+      与 ``nonebot.compat.type_validate_python`` 等价, 但不会在每次调用时重新构建 ``TypeAdapter``。
+    """
+    validator = _validators.get(type_)
+    if validator is None:
+        validator = _validators[type_] = _build_validator(type_)
+    return validator
+
+
+def clear_validators() -> None:
+    """清空已构建的校验函数"""
+    _validators.clear()
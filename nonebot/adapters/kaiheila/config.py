@@ -1,4 +1,5 @@
-from typing import List, Optional, Tuple
+from pathlib import Path
+from typing import Set, Dict, List, Tuple, Literal, Optional
 
 from pydantic import Field, BaseModel
 from nonebot.compat import PYDANTIC_V2, ConfigDict
@@ -9,9 +10,13 @@ class BotConfig(BaseModel):
     Kaiheila Bot 配置类
     :配置项:
       - ``token``: Kaiheila 开发者中心获得
+      - ``dispatch_workers``: 该 Bot 同时处理的事件数上限, 未设置时使用 ``kaiheila_dispatch_workers``
+      - ``weight``: 连接握手排队时的优先级, 越大越先连接, 默认为 1
     """
 
     token: str
+    dispatch_workers: Optional[int] = None
+    weight: float = 1.0
 
     if PYDANTIC_V2:
         model_config = ConfigDict(
@@ -32,7 +37,50 @@ class Config(BaseModel):
     :配置项:
 
       - ``kaiheila_bots`` : Kaiheila 开发者中心获得
+      - ``kaiheila_bots_file`` : Bot 列表文件 (JSON, 格式同 ``kaiheila_bots``), 设置后代替 ``kaiheila_bots``, 运行时修改文件即可增删 Bot
+      - ``kaiheila_drain_timeout`` : 停机时等待事件处理与发送队列完成的最长秒数, 默认为 10
+      - ``kaiheila_bots_file_interval`` : 检查 Bot 列表文件修改时间的间隔秒数, 默认为 5
       - ``compress`` : 是否开启压缩, 默认为 False
+      - ``kaiheila_ignore_events`` / ``kaiheila_include_events`` : 忽略 / 只保留以这些字符串开头的事件
+      - ``kaiheila_ignore_guilds`` / ``kaiheila_include_guilds`` : 忽略 / 只保留这些服务器的事件
+      - ``kaiheila_ignore_channels`` / ``kaiheila_include_channels`` : 忽略 / 只保留这些频道的事件
+      - ``kaiheila_ignore_channel_types`` / ``kaiheila_include_channel_types`` : 忽略 / 只保留这些 channel_type 的事件
+      - ``kaiheila_dispatch_workers`` : 每个 Bot 同时处理的事件数上限, 同一频道或用户的事件按顺序依次处理, 默认为 4
+      - ``kaiheila_dispatch_queue_size`` : 每个并发名额对应的排队事件数, 排队事件总数上限为其与 ``kaiheila_dispatch_workers`` 之积, 默认为 100
+      - ``kaiheila_dispatch_put_timeout`` : 事件队列满时等待的最长秒数, 默认为 ``None``, 即一直等待;
+        设置后超时的事件将被丢弃、计数并记录警告日志, 被丢弃的事件不会在 resume 时重发
+      - ``kaiheila_sn_gap_timeout`` : sn 缺口的最长等待秒数, 超时后发起 resume, 默认为 6
+      - ``kaiheila_checkpoint_path`` : 会话断点保存路径, ``.db`` 后缀使用 SQLite, 否则使用 JSON 文件, 默认不落盘
+      - ``kaiheila_checkpoint_interval`` : 合并写入断点的间隔秒数, 默认为 1
+      - ``kaiheila_heartbeat_interval`` : 心跳间隔秒数, 实际间隔带有 ±1/6 的随机抖动, 默认为 30
+      - ``kaiheila_pong_timeout`` : 等待 PONG 的秒数, 默认为 6
+      - ``kaiheila_ping_retries`` : 未收到 PONG 时重试 PING 的次数, 之后发起 resume, 默认为 2
+      - ``kaiheila_hello_timeout`` : 连接后等待 HELLO 的秒数, 默认为 6
+      - ``kaiheila_inplace_resume`` : 心跳超时或 sn 缺口超时时, 是否先在原连接上发送 RESUME 信令恢复会话, 默认为 True
+      - ``kaiheila_resume_ack_timeout`` : 在原连接上 resume 时等待 RESUME ACK 的秒数, 超时后重新连接, 默认为 6
+      - ``kaiheila_resume_retries`` : resume 连续失败该次数后放弃会话重新连接, 默认为 2
+      - ``kaiheila_reconnect_base_delay`` / ``kaiheila_reconnect_max_delay`` : 重连指数退避的基础 / 最长等待秒数, 默认为 2 / 60
+      - ``kaiheila_handshake_concurrency`` : 所有 Bot 同时进行的握手 (获取网关、建立连接、等待 HELLO、获取 Bot 信息) 数, 默认为 4
+      - ``kaiheila_handshake_jitter`` : 重连排队前随机等待的最长秒数, 默认为 1
+      - ``kaiheila_gateway_url_ttl`` : 重连时复用网关地址的有效秒数, 默认为 3600
+      - ``kaiheila_decompress_offload_threshold`` : 超过该字节数的压缩帧在线程池中解压, 默认为 65536
+      - ``kaiheila_json_codec`` : JSON 编解码后端, 默认依次尝试 orjson、msgspec、json
+      - ``kaiheila_rate_limit`` : 是否根据 ``X-Rate-Limit-*`` 响应头在本地排队请求, 默认为 True
+      - ``kaiheila_rate_limit_retries`` : 收到 429 后重新排队的最大次数, 默认为 3
+      - ``kaiheila_api_retries`` : GET 接口与消息发送接口的最大重试次数, 默认为 2
+      - ``kaiheila_api_retry_unsafe`` : 非 GET 接口是否在超时、5xx 等请求可能已被处理的错误时重试 (可能重复发送消息), 默认只在 429 与连接失败时重试
+      - ``kaiheila_api_retry_base_delay`` / ``kaiheila_api_retry_max_delay`` : 重试退避的基础 / 最长等待秒数
+      - ``kaiheila_api_retry_budget`` : 每个请求可换取的重试次数比例, 默认为 0.2
+      - ``kaiheila_api_coalesce`` : 是否合并并发的相同 GET 请求, 默认为 True
+      - ``kaiheila_api_cache`` : 是否缓存用户/服务器/频道/角色等 GET 接口的结果, 默认为 False
+      - ``kaiheila_api_cache_size`` : 缓存的最大条目数, 默认为 1024
+      - ``kaiheila_api_cache_ttl`` : 接口 -> 缓存秒数, 覆盖默认的 300 秒, 设为 0 表示不缓存该接口
+      - ``kaiheila_send_queue`` : 是否按频道/用户排队发送消息, 保证同一目标的消息按顺序发出, 默认为 False
+      - ``kaiheila_send_coalesce_window`` : 排队时合并该秒数内的纯文本/KMarkdown 消息, 默认为 0 (不合并)
+      - ``kaiheila_send_slow_mode`` : 排队时是否遵守频道的慢速模式, 默认为 True
+      - ``kaiheila_segment_concurrency`` : 发送消息时最多同时上传的本地媒体数, 默认为 4
+      - ``kaiheila_asset_cache_size`` : 内存中缓存的上传文件 URL 数, 相同内容不再重复上传, 设为 0 关闭, 默认为 256
+      - ``kaiheila_asset_cache_path`` : 上传文件摘要索引的 SQLite 路径, 默认不落盘
 
     :示例:
 
@@ -42,9 +90,58 @@ class Config(BaseModel):
     """
 
     kaiheila_bots: List["BotConfig"] = Field(default_factory=list)
+    kaiheila_bots_file: Optional[Path] = Field(default=None)
+    kaiheila_bots_file_interval: float = Field(default=5.0)
+    kaiheila_drain_timeout: float = Field(default=10.0)
     compress: Optional[bool] = Field(default=False)
     kaiheila_ignore_events: Tuple[str, ...] = Field(default_factory=tuple)
+    kaiheila_include_events: Tuple[str, ...] = Field(default_factory=tuple)
+    kaiheila_include_guilds: Set[str] = Field(default_factory=set)
+    kaiheila_ignore_guilds: Set[str] = Field(default_factory=set)
+    kaiheila_include_channels: Set[str] = Field(default_factory=set)
+    kaiheila_ignore_channels: Set[str] = Field(default_factory=set)
+    kaiheila_include_channel_types: Set[str] = Field(default_factory=set)
+    kaiheila_ignore_channel_types: Set[str] = Field(default_factory=set)
     kaiheila_ignore_other_bots: Optional[bool] = Field(default=True)
+    kaiheila_dispatch_workers: int = Field(default=4)
+    kaiheila_dispatch_queue_size: int = Field(default=100)
+    kaiheila_dispatch_put_timeout: Optional[float] = Field(default=None)
+    kaiheila_sn_gap_timeout: float = Field(default=6.0)
+    kaiheila_checkpoint_path: Optional[Path] = Field(default=None)
+    kaiheila_checkpoint_interval: float = Field(default=1.0)
+    kaiheila_heartbeat_interval: float = Field(default=30.0)
+    kaiheila_pong_timeout: float = Field(default=6.0)
+    kaiheila_ping_retries: int = Field(default=2)
+    kaiheila_hello_timeout: float = Field(default=6.0)
+    kaiheila_inplace_resume: bool = Field(default=True)
+    kaiheila_resume_ack_timeout: float = Field(default=6.0)
+    kaiheila_resume_retries: int = Field(default=2)
+    kaiheila_reconnect_base_delay: float = Field(default=2.0)
+    kaiheila_reconnect_max_delay: float = Field(default=60.0)
+    kaiheila_gateway_url_ttl: float = Field(default=3600.0)
+    kaiheila_handshake_concurrency: int = Field(default=4)
+    kaiheila_handshake_jitter: float = Field(default=1.0)
+    kaiheila_decompress_offload_threshold: int = Field(default=64 * 1024)
+    kaiheila_json_codec: Optional[Literal["orjson", "msgspec", "json"]] = Field(
+        default=None
+    )
+    kaiheila_rate_limit: bool = Field(default=True)
+    kaiheila_rate_limit_retries: int = Field(default=3)
+    kaiheila_api_retries: int = Field(default=2)
+    kaiheila_api_retry_unsafe: bool = Field(default=False)
+    kaiheila_api_retry_base_delay: float = Field(default=0.5)
+    kaiheila_api_retry_max_delay: float = Field(default=10.0)
+    kaiheila_api_retry_budget: float = Field(default=0.2)
+    kaiheila_api_coalesce: bool = Field(default=True)
+    kaiheila_api_cache: bool = Field(default=False)
+    kaiheila_api_cache_size: int = Field(default=1024)
+    kaiheila_api_cache_ttl: Dict[str, float] = Field(default_factory=dict)
+    kaiheila_send_queue: bool = Field(default=False)
+    kaiheila_send_coalesce_window: float = Field(default=0.0)
+    kaiheila_send_slow_mode: bool = Field(default=True)
+    kaiheila_segment_concurrency: int = Field(default=4)
+    kaiheila_asset_cache_size: int = Field(default=256)
+    kaiheila_asset_cache_path: Optional[Path] = Field(default=None)
 
     if PYDANTIC_V2:
         model_config = ConfigDict(
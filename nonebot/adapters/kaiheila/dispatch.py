@@ -0,0 +1,276 @@
+import asyncio
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Set,
+    Dict,
+    Deque,
+    Tuple,
+    Optional,
+    Coroutine,
+    NamedTuple,
+)
+
+from nonebot.utils import escape_tag
+
+from .utils import log
+from .event import Event, OriginEvent
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+
+class DispatcherStats(NamedTuple):
+    """事件分发器统计信息"""
+
+    workers: int
+    """同时处理的事件数上限"""
+    queue_depth: int
+    """当前排队中的事件数"""
+    in_flight: int
+    """正在处理中的事件数"""
+    processed: int
+    """已处理完成的事件数"""
+    dropped: int
+    """因队列已满被丢弃的事件数"""
+
+
+class DrainStats(NamedTuple):
+    """停机排空统计信息"""
+
+    events: int
+    """排空期间处理完成的事件数"""
+    sends: int
+    """排空期间发送完成的消息数"""
+    cancelled: int
+    """到达时限时被取消的事件处理与消息发送数"""
+    lost: int
+    """到达时限时仍在排队、未被处理的事件与消息数"""
+    elapsed: float
+    """排空耗时"""
+
+
+def _ordering_key(event: OriginEvent) -> Optional[str]:
+    """
+    :说明:
+
+      获取事件的顺序键, 顺序键相同的事件按接收顺序依次处理。
+
+      频道内的事件以频道 (``target_id``) 为键, 私聊事件以用户为键, 元事件没有顺序键。
+    """
+    if not isinstance(event, Event):
+        return None
+    if event.channel_type == "GROUP":
+        return event.target_id
+    return event.user_id
+
+
+class EventDispatcher:
+    """
+    :说明:
+
+      有界、保序的事件分发器。
+
+      每个顺序键 (频道或用户) 有自己的先进先出队列, 同一频道或用户的事件按接收顺序依次处理,
+      不同频道之间互不等待; 同时处理的事件数不超过 ``workers``。
+      排队中的事件总数达到 ``workers × queue_size`` 时 ``dispatch`` 会阻塞,
+      从而对 websocket 读取形成背压; 若设置了 ``put_timeout``, 超时后事件将被丢弃、计数并记录警告日志,
+      被丢弃的事件不会在 resume 时重发。
+
+      元事件 (心跳、resume 等) 不经过队列, 由 ``dispatch_nowait`` 立即处理;
+      ``backpressure`` 表示读取是否正被阻塞, 阻塞期间心跳不将未读到的 PONG 计为超时。
+
+    :参数:
+
+      * ``name: str``: 分发器名称, 用于日志
+      * ``workers: int``: 同时处理的事件数上限
+      * ``queue_size: int``: 每个并发名额对应的排队事件数, 与 ``workers`` 之积为排队事件总数上限
+      * ``put_timeout: Optional[float]``: 队列满时等待的最长时间, ``None`` 表示一直等待
+    """
+
+    def __init__(
+        self,
+        name: str,
+        workers: int = 4,
+        queue_size: int = 100,
+        put_timeout: Optional[float] = None,
+    ):
+        self.name = name
+        self.workers = max(workers, 1)
+        self.capacity = self.workers * max(queue_size, 1)
+        self.put_timeout = put_timeout
+        self._semaphore = asyncio.Semaphore(self.workers)
+        self._chains: Dict[str, "Deque[Tuple[Bot, OriginEvent, Optional[int]]]"] = {}
+        self._pending_sns: Set[int] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._queued = 0
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._blocked = 0
+        self._unblocked = asyncio.Event()
+        self._unblocked.set()
+        self._in_flight = 0
+        self.processed = 0
+        self.dropped = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    def stats(self) -> DispatcherStats:
+        return DispatcherStats(
+            workers=self.workers,
+            queue_depth=self.queue_depth,
+            in_flight=self._in_flight,
+            processed=self.processed,
+            dropped=self.dropped,
+        )
+
+    @property
+    def backpressure(self) -> bool:
+        """是否有 ``dispatch`` 正因队列已满而等待"""
+        return self._blocked > 0
+
+    async def wait_unblocked(self) -> None:
+        """等待因队列已满而阻塞的 ``dispatch`` 全部返回"""
+        await self._unblocked.wait()
+
+    def oldest_pending_sn(self) -> Optional[int]:
+        """排队中或处理中的事件的最小 sn, 没有时返回 ``None``"""
+        return min(self._pending_sns, default=None)
+
+    async def join(self) -> None:
+        """等待所有排队中与处理中的事件处理完成"""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def stop(self) -> None:
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._chains.clear()
+        self._queued = 0
+        self._not_full.set()
+
+    async def _wait_not_full(self) -> None:
+        while self._queued >= self.capacity:
+            self._not_full.clear()
+            await self._not_full.wait()
+
+    async def dispatch(
+        self, bot: "Bot", event: OriginEvent, sn: Optional[int] = None
+    ) -> bool:
+        """
+        :说明:
+
+          将事件放入其顺序键对应的队列。
+
+          传入 ``sn`` 时记录该事件直到处理完成, 用于计算可以安全保存的断点。
+
+        :返回:
+
+          - ``bool``: 事件是否成功入队, 被丢弃时返回 ``False``
+        """
+        if sn is not None:
+            self._pending_sns.add(sn)
+        blocked = self._queued >= self.capacity
+        if blocked:
+            self._blocked += 1
+            self._unblocked.clear()
+        try:
+            if self.put_timeout is None:
+                await self._wait_not_full()
+            else:
+                await asyncio.wait_for(self._wait_not_full(), self.put_timeout)
+        except asyncio.TimeoutError:
+            if sn is not None:
+                self._pending_sns.discard(sn)
+            self.dropped += 1
+            log(
+                "WARNING",
+                f"<y>Dispatcher {escape_tag(self.name)}</y> queue is full, "
+                f"event dropped (total dropped: {self.dropped})",
+            )
+            return False
+        except BaseException:
+            if sn is not None:
+                self._pending_sns.discard(sn)
+            raise
+        finally:
+            if blocked:
+                self._blocked -= 1
+                if not self._blocked:
+                    self._unblocked.set()
+
+        self._queued += 1
+        key = _ordering_key(event)
+        if key is None:
+            self._spawn(self._run_one(bot, event, sn))
+            return True
+        chain = self._chains.get(key)
+        if chain is not None:
+            chain.append((bot, event, sn))
+        else:
+            self._chains[key] = deque([(bot, event, sn)])
+            self._spawn(self._run_chain(key))
+        return True
+
+    def dispatch_nowait(self, bot: "Bot", event: OriginEvent) -> None:
+        """
+        :说明:
+
+          不经过队列立即处理事件, 用于元事件, 不会阻塞 websocket 读取。
+        """
+        self._spawn(self._handle(bot, event))
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _dequeued(self) -> None:
+        self._queued -= 1
+        if self._queued < self.capacity:
+            self._not_full.set()
+
+    async def _run_one(self, bot: "Bot", event: OriginEvent, sn: Optional[int]) -> None:
+        async with self._semaphore:
+            self._dequeued()
+            await self._handle(bot, event)
+        if sn is not None:
+            self._pending_sns.discard(sn)
+
+    async def _run_chain(self, key: str) -> None:
+        chain = self._chains[key]
+        try:
+            while chain:
+                async with self._semaphore:
+                    bot, event, sn = chain.popleft()
+                    self._dequeued()
+                    await self._handle(bot, event)
+                if sn is not None:
+                    self._pending_sns.discard(sn)
+        finally:
+            # 被取消时未处理完的事件的 sn 仍记为未处理, 断点不会越过它们
+            if self._chains.get(key) is chain:
+                del self._chains[key]
+
+    async def _handle(self, bot: "Bot", event: OriginEvent) -> None:
+        self._in_flight += 1
+        try:
+            await bot.handle_event(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log(
+                "ERROR",
+                "<r><bg #f8bbd0>Error while handling event for bot "
+                f"{escape_tag(bot.self_id)}</bg #f8bbd0></r>",
+                e,
+            )
+        finally:
+            self._in_flight -= 1
+            self.processed += 1
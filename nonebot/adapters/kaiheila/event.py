@@ -1,7 +1,7 @@
 import inspect
 from enum import IntEnum
-from typing import List, Type, Union, Optional
 from typing_extensions import Literal, override
+from typing import Any, Dict, List, Type, Union, Callable, Optional
 
 from pygtrie import StringTrie
 from nonebot.utils import escape_tag
@@ -10,11 +10,11 @@ from pydantic import Field, HttpUrl, BaseModel, validator
 
 from nonebot.adapters import Event as BaseEvent
 
-from .utils import AttrDict
-from .compat import model_validator
+from .utils import AttrDict, log
 from .exception import NoLogException
 from .message import Message, MessageDeserializer
 from .api import Role, User, Emoji, Guild, Channel
+from .compat import get_validator, model_validator
 
 
 class EventTypes(IntEnum):
@@ -941,17 +941,39 @@ class ResumeAckMetaEvent(MetaEvent):
     meta_event_type: Literal["resume_ack"]
 
 
-_t = StringTrie(separator=".")
+_t: Optional[StringTrie] = None
+_event_model_cache: Dict[str, List[Type[OriginEvent]]] = {}
+_event_parsers: Dict[str, Callable[[Any], OriginEvent]] = {}
 
-# define `model` first to avoid globals changing while `for`
-model = None
-for model in globals().values():
-    if not inspect.isclass(model) or not issubclass(model, OriginEvent):
-        continue
-    _t["." + model.__event__] = model
 
+def _event_models() -> StringTrie:
+    """首次查询时才扫描本模块, 构建事件名到 ``Event Model`` 的前缀树"""
+    global _t
 
-def get_event_model(event_name) -> List[Type[OriginEvent]]:
+    if _t is None:
+        trie = StringTrie(separator=".")
+        for model in list(globals().values()):
+            if not inspect.isclass(model) or not issubclass(model, OriginEvent):
+                continue
+            # 只登记自身声明了 __event__ 的 Model, 继承而来的事件名属于父类
+            if "__event__" in vars(model):
+                trie["." + model.__event__] = model
+        _t = trie
+    return _t
+
+
+def register_event_model(model: Type[OriginEvent]) -> None:
+    """
+    :说明:
+
+      注册自定义 ``Event Model``, 同名事件将覆盖已有的 ``Event Model``
+    """
+    _event_models()["." + model.__event__] = model
+    _event_model_cache.clear()
+    _event_parsers.clear()
+
+
+def get_event_model(event_name: str) -> List[Type[OriginEvent]]:
     """
     :说明:
 
@@ -961,7 +983,58 @@ def get_event_model(event_name) -> List[Type[OriginEvent]]:
 
       - ``List[Type[Event]]``
     """
-    return [model.value for model in _t.prefixes("." + event_name)][::-1]
+    models = _event_model_cache.get(event_name)
+    if models is None:
+        models = _event_model_cache[event_name] = [
+            model.value for model in _event_models().prefixes("." + event_name)
+        ][::-1]
+    return models
+
+
+def has_event_model(event_name: str) -> bool:
+    """事件名是否有 ``__event__`` 与之完全相同的 ``Event Model``"""
+    return "." + event_name in _event_models()
+
+
+def get_event_parser(event_name: str) -> Callable[[Any], OriginEvent]:
+    """
+    :说明:
+
+      根据事件名获取解析函数, 解析函数按 ``get_event_model`` 的顺序校验:
+      先用 ``__event__`` 与事件名最接近的 ``Event Model``
+      (没有完全相同的 ``Event Model`` 时为最近的已声明的上级事件), 校验失败时依次退回上级事件,
+      最后使用基类 ``Event``
+
+    :返回:
+
+      - ``Callable[[Any], Event]``
+    """
+    parser = _event_parsers.get(event_name)
+    if parser is None:
+        models = get_event_model(event_name)
+        if not models or models[-1] is not Event:
+            models = [*models, Event]
+        parser = _event_parsers[event_name] = _with_fallback(
+            [get_validator(model) for model in models]
+        )
+    return parser
+
+
+def _with_fallback(
+    validators: List[Callable[[Any], OriginEvent]]
+) -> Callable[[Any], OriginEvent]:
+    if len(validators) == 1:
+        return validators[0]
+
+    def parse(data: Any) -> OriginEvent:
+        for validate in validators[:-1]:
+            try:
+                return validate(data)
+            except Exception as e:
+                log("DEBUG", "Event Parser Error", e)
+        return validators[-1](data)
+
+    return parse
 
 
 __all__ = [
@@ -31,6 +31,7 @@ class ActionFailed(BaseActionFailed, KaiheilaAdapterException):
 
     def __init__(self, response: Response):
         self.status_code: int = response.status_code
+        self.headers = response.headers
         self.code: Optional[int] = None
         self.message: Optional[str] = None
         self.data: Optional[dict] = None
@@ -136,6 +137,60 @@ class ReconnectError(KaiheilaAdapterException):
         return self.__repr__()
 
 
+class SnGapError(KaiheilaAdapterException):
+    """
+    :说明:
+
+      收到的 sn 出现缺口且在超时时间内未能补齐, 需要从 ``last_sn`` 处 resume。
+    """
+
+    def __init__(self, last_sn: int):
+        super().__init__()
+        self.last_sn = last_sn
+
+    def __repr__(self):
+        return f"<SnGapError last_sn={self.last_sn}>"
+
+    def __str__(self):
+        return self.__repr__()
+
+
+class HeartbeatTimeoutError(KaiheilaAdapterException):
+    """
+    :说明:
+
+      发送 PING 后多次重试仍未收到 PONG, 连接可能已经失效。
+    """
+
+    def __init__(self, attempts: int):
+        super().__init__()
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"<HeartbeatTimeoutError attempts={self.attempts}>"
+
+    def __str__(self):
+        return self.__repr__()
+
+
+class HelloTimeoutError(KaiheilaAdapterException):
+    """
+    :说明:
+
+      连接网关后未能在超时时间内收到 HELLO 信令。
+    """
+
+    def __init__(self, timeout: float):
+        super().__init__()
+        self.timeout = timeout
+
+    def __repr__(self):
+        return f"<HelloTimeoutError timeout={self.timeout}>"
+
+    def __str__(self):
+        return self.__repr__()
+
+
 class TokenError(KaiheilaAdapterException):
     """
     :说明:
@@ -0,0 +1,133 @@
+from typing import Any, Dict, List, Callable, Iterable, Optional
+
+from .event import EventTypes
+from .config import Config as KaiheilaConfig
+
+_sub_type_names: Dict[int, str] = {i.value: i.name.lower() for i in EventTypes}
+
+
+def raw_event_name(d: Dict[str, Any]) -> str:
+    """
+    :说明:
+
+      根据未经处理的 ``d`` 字段计算事件名, 与 ``Adapter.json_to_event`` 得到的事件名一致
+    """
+    if d.get("type") == EventTypes.sys:
+        return f"notice.{d.get('extra', {}).get('type')}"
+    message_type = str(d.get("channel_type")).lower()
+    message_type = "private" if message_type == "person" else message_type
+    sub_type = _sub_type_names.get(d.get("extra", {}).get("type"))
+    return f"message.{message_type}" + (f".{sub_type}" if sub_type else "")
+
+
+def raw_guild_id(d: Dict[str, Any]) -> Optional[str]:
+    if d.get("channel_type") != "GROUP":
+        return None
+    if d.get("type") == EventTypes.sys:
+        return d.get("target_id")
+    return d.get("extra", {}).get("guild_id")
+
+
+def raw_channel_id(d: Dict[str, Any]) -> Optional[str]:
+    if d.get("channel_type") != "GROUP":
+        return None
+    if d.get("type") == EventTypes.sys:
+        return (d.get("extra", {}).get("body") or {}).get("channel_id")
+    return d.get("target_id")
+
+
+class FrameFilter:
+    """
+    :说明:
+
+      在解析事件之前, 按未经处理的 ``d`` 字段过滤消息帧。
+
+      只为配置了的规则生成检查函数, 未配置任何规则时不产生额外开销。
+      服务器与频道规则只作用于带有服务器/频道信息的消息帧, 私聊消息不受影响。
+
+    :参数:
+
+      * ``include_events``: 只保留以这些字符串开头的事件名
+      * ``ignore_events``: 忽略以这些字符串开头的事件名
+      * ``include_guilds`` / ``ignore_guilds``: 只保留 / 忽略这些服务器的消息
+      * ``include_channels`` / ``ignore_channels``: 只保留 / 忽略这些频道的消息
+      * ``include_channel_types`` / ``ignore_channel_types``: 只保留 / 忽略这些 ``channel_type`` 的消息
+    """
+
+    def __init__(
+        self,
+        *,
+        include_events: Iterable[str] = (),
+        ignore_events: Iterable[str] = (),
+        include_guilds: Iterable[str] = (),
+        ignore_guilds: Iterable[str] = (),
+        include_channels: Iterable[str] = (),
+        ignore_channels: Iterable[str] = (),
+        include_channel_types: Iterable[str] = (),
+        ignore_channel_types: Iterable[str] = (),
+    ):
+        self._checks: List[Callable[[Dict[str, Any]], bool]] = []
+
+        include_channel_types = frozenset(include_channel_types)
+        if include_channel_types:
+            self._checks.append(
+                lambda d: d.get("channel_type") in include_channel_types
+            )
+        ignore_channel_types = frozenset(ignore_channel_types)
+        if ignore_channel_types:
+            self._checks.append(
+                lambda d: d.get("channel_type") not in ignore_channel_types
+            )
+
+        self._add_id_rules(raw_guild_id, include_guilds, ignore_guilds)
+        self._add_id_rules(raw_channel_id, include_channels, ignore_channels)
+
+        include_events = tuple(include_events)
+        if include_events:
+            self._checks.append(lambda d: raw_event_name(d).startswith(include_events))
+        ignore_events = tuple(ignore_events)
+        if ignore_events:
+            self._checks.append(
+                lambda d: not raw_event_name(d).startswith(ignore_events)
+            )
+
+    def _add_id_rules(
+        self,
+        get_id: Callable[[Dict[str, Any]], Optional[str]],
+        include: Iterable[str],
+        ignore: Iterable[str],
+    ) -> None:
+        include = frozenset(include)
+        ignore = frozenset(ignore)
+        if include:
+
+            def check_include(d: Dict[str, Any]) -> bool:
+                id_ = get_id(d)
+                return id_ is None or id_ in include
+
+            self._checks.append(check_include)
+        if ignore:
+            self._checks.append(lambda d: get_id(d) not in ignore)
+
+    @classmethod
+    def from_config(cls, config: KaiheilaConfig) -> "FrameFilter":
+        return cls(
+            include_events=config.kaiheila_include_events,
+            ignore_events=config.kaiheila_ignore_events,
+            include_guilds=config.kaiheila_include_guilds,
+            ignore_guilds=config.kaiheila_ignore_guilds,
+            include_channels=config.kaiheila_include_channels,
+            ignore_channels=config.kaiheila_ignore_channels,
+            include_channel_types=config.kaiheila_include_channel_types,
+            ignore_channel_types=config.kaiheila_ignore_channel_types,
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self._checks)
+
+    def __call__(self, d: Dict[str, Any]) -> bool:
+        """返回 ``True`` 表示保留该消息帧"""
+        for check in self._checks:
+            if not check(d):
+                return False
+        return True
@@ -0,0 +1,238 @@
+import time
+import random
+import asyncio
+from enum import Enum
+from collections import deque
+from typing import Dict, Deque, Optional, FrozenSet, NamedTuple
+
+
+class SessionState(str, Enum):
+    """
+    网关会话状态
+
+    .. KOOK 文档:
+        https://developer.kaiheila.cn/doc/websocket#连接流程
+    """
+
+    IDLE = "idle"
+    """尚未连接"""
+    FETCHING_GATEWAY = "fetching_gateway"
+    """正在获取网关地址"""
+    CONNECTING = "connecting"
+    """正在建立新会话, 等待 HELLO"""
+    RESUMING = "resuming"
+    """正在以 resume 参数重新连接, 等待 HELLO"""
+    CONNECTED = "connected"
+    """已连接"""
+    HEARTBEAT_TIMEOUT = "heartbeat_timeout"
+    """未按时收到 PONG, 正在重试 PING"""
+    RESUMING_INPLACE = "resuming_inplace"
+    """已在当前连接上发送 RESUME 信令, 等待 RESUME ACK"""
+    DISCONNECTED = "disconnected"
+    """连接已断开"""
+    BACKOFF = "backoff"
+    """等待重连"""
+    STOPPED = "stopped"
+    """已停止"""
+
+
+_S = SessionState
+
+TRANSITIONS: Dict[SessionState, FrozenSet[SessionState]] = {
+    _S.IDLE: frozenset({_S.FETCHING_GATEWAY, _S.CONNECTING, _S.RESUMING, _S.STOPPED}),
+    _S.FETCHING_GATEWAY: frozenset(
+        {_S.CONNECTING, _S.RESUMING, _S.DISCONNECTED, _S.STOPPED}
+    ),
+    _S.CONNECTING: frozenset({_S.CONNECTED, _S.DISCONNECTED, _S.STOPPED}),
+    _S.RESUMING: frozenset({_S.CONNECTED, _S.DISCONNECTED, _S.STOPPED}),
+    _S.CONNECTED: frozenset(
+        {_S.HEARTBEAT_TIMEOUT, _S.RESUMING_INPLACE, _S.DISCONNECTED, _S.STOPPED}
+    ),
+    _S.HEARTBEAT_TIMEOUT: frozenset(
+        {_S.CONNECTED, _S.RESUMING_INPLACE, _S.DISCONNECTED, _S.STOPPED}
+    ),
+    _S.RESUMING_INPLACE: frozenset({_S.CONNECTED, _S.DISCONNECTED, _S.STOPPED}),
+    _S.DISCONNECTED: frozenset({_S.BACKOFF, _S.STOPPED}),
+    _S.BACKOFF: frozenset(
+        {_S.FETCHING_GATEWAY, _S.CONNECTING, _S.RESUMING, _S.STOPPED}
+    ),
+    _S.STOPPED: frozenset(),
+}
+"""允许的状态转换"""
+
+
+class StateTransition(NamedTuple):
+    """一次状态转换"""
+
+    at: float
+    """发生时间 (Unix 时间戳)"""
+    monotonic: float
+    """发生时间 (``time.monotonic``), 用于计算间隔"""
+    source: SessionState
+    target: SessionState
+    reason: str
+
+
+class SessionStats(NamedTuple):
+    """网关会话统计信息"""
+
+    state: SessionState
+    state_since: float
+    """进入当前状态的 Unix 时间戳"""
+    transitions: int
+    """累计状态转换次数"""
+    recoveries: int
+    """断开后恢复连接的次数"""
+    last_recovery: Optional[float]
+    """最近一次从断开到恢复连接的秒数"""
+    max_recovery: float
+    """从断开到恢复连接的最长秒数"""
+    inplace_resumes: int
+    """在原连接上 resume 成功的次数"""
+    inplace_resume_failures: int
+    """在原连接上 resume 失败、转为重新连接的次数"""
+    reconnect_resumes: int
+    """重新连接并以 resume 参数恢复会话的次数"""
+    new_sessions: int
+    """建立新会话的次数"""
+
+
+class Backoff:
+    """
+    :说明:
+
+      带抖动的指数退避: 第 n 次等待 ``min(cap, base * 2^n)`` 的一半到全部之间的随机时长。
+
+    :参数:
+
+      * ``base: float``: 首次等待的最长秒数
+      * ``cap: float``: 单次等待的最长秒数
+    """
+
+    def __init__(self, base: float = 2.0, cap: float = 60.0):
+        self.base = base
+        self.cap = cap
+        self.attempt = 0
+
+    def next(self) -> float:
+        delay = min(self.cap, self.base * 2 ** min(self.attempt, 32))
+        self.attempt += 1
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def reset(self) -> None:
+        self.attempt = 0
+
+
+class GatewaySession:
+    """
+    :说明:
+
+      单个 Bot 的网关会话状态机, 只记录状态, 不进行任何 IO, 由 ``Adapter`` 驱动。
+
+      每次状态转换都带有时间戳, 保留最近 ``history`` 条, 并据此统计从断开
+      (或开始在原连接上 resume) 到恢复连接的耗时, 以及各恢复路径的次数。
+      非法的状态转换会抛出 ``RuntimeError``。
+
+    :参数:
+
+      * ``token: str``: Bot token
+      * ``history: int``: 保留的状态转换条数
+    """
+
+    def __init__(self, token: str, history: int = 100):
+        self.token = token
+        self.state = SessionState.IDLE
+        self.state_since = time.time()
+        self.transitions: Deque[StateTransition] = deque(maxlen=history)
+        self.transition_count = 0
+
+        self.self_id: Optional[str] = None
+        self.session_id: Optional[str] = None
+        self.gateway_url: Optional[str] = None
+        self.gateway_fetched_at = 0.0
+        self.resume_failures = 0
+        self.pong = asyncio.Event()
+        self.resume_ack = asyncio.Event()
+
+        self._down_since: Optional[float] = None
+        self.recoveries = 0
+        self.last_recovery: Optional[float] = None
+        self.max_recovery = 0.0
+        self.inplace_resumes = 0
+        self.inplace_resume_failures = 0
+        self.reconnect_resumes = 0
+        self.new_sessions = 0
+
+    def transition(self, target: SessionState, reason: str = "") -> StateTransition:
+        if target not in TRANSITIONS[self.state]:
+            raise RuntimeError(
+                f"Invalid gateway session transition {self.state.value} -> "
+                f"{target.value} ({reason})"
+            )
+        record = StateTransition(
+            time.time(), time.monotonic(), self.state, target, reason
+        )
+        self.transitions.append(record)
+        self.transition_count += 1
+        source, self.state = self.state, target
+        self.state_since = record.at
+
+        if source is SessionState.RESUMING_INPLACE:
+            if target is SessionState.CONNECTED:
+                self.inplace_resumes += 1
+            elif target is SessionState.DISCONNECTED:
+                self.inplace_resume_failures += 1
+        elif target is SessionState.RESUMING:
+            self.reconnect_resumes += 1
+        elif target is SessionState.CONNECTING:
+            self.new_sessions += 1
+
+        if (
+            target in (SessionState.DISCONNECTED, SessionState.RESUMING_INPLACE)
+            and self._down_since is None
+        ):
+            self._down_since = record.monotonic
+        elif target is SessionState.CONNECTED and self._down_since is not None:
+            self.last_recovery = record.monotonic - self._down_since
+            self.max_recovery = max(self.max_recovery, self.last_recovery)
+            self.recoveries += 1
+            self._down_since = None
+        return record
+
+    def stats(self) -> SessionStats:
+        return SessionStats(
+            state=self.state,
+            state_since=self.state_since,
+            transitions=self.transition_count,
+            recoveries=self.recoveries,
+            last_recovery=self.last_recovery,
+            max_recovery=self.max_recovery,
+            inplace_resumes=self.inplace_resumes,
+            inplace_resume_failures=self.inplace_resume_failures,
+            reconnect_resumes=self.reconnect_resumes,
+            new_sessions=self.new_sessions,
+        )
+
+    def can_resume(self) -> bool:
+        return bool(self.self_id and self.session_id and self.gateway_url)
+
+    def resume_url(self, sn: int) -> str:
+        return f"{self.gateway_url}&resume=1&sn={sn}&session_id={self.session_id}"
+
+    def set_gateway(self, url: str) -> None:
+        self.gateway_url = url
+        self.gateway_fetched_at = time.monotonic()
+
+    def gateway_valid(self, ttl: float) -> bool:
+        return (
+            self.gateway_url is not None
+            and time.monotonic() - self.gateway_fetched_at < ttl
+        )
+
+    def discard_gateway(self) -> None:
+        self.gateway_url = None
+
+    def reset_session(self) -> None:
+        """放弃当前会话, 下次连接时建立新会话"""
+        self.session_id = None
+        self.resume_failures = 0
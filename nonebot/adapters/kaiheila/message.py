@@ -1,21 +1,30 @@
-import json
+import asyncio
 import warnings
 from abc import ABC
+from io import IOBase
 from pathlib import Path
 from dataclasses import dataclass
 from collections.abc import Iterable
 from typing_extensions import Self, override
 from typing import TYPE_CHECKING, Any, Type, Union, Callable, Optional, TypedDict, cast
 
+from nonebot.utils import run_sync
+
 from nonebot.adapters import Message as BaseMessage
 from nonebot.adapters import MessageSegment as BaseMessageSegment
 
-from .utils import BytesReadable, escape_kmarkdown, unescape_kmarkdown
 from .exception import (
     UnsupportedMessageType,
     KaiheilaAdapterException,
     UnsupportedMessageOperation,
 )
+from .utils import (
+    BytesReadable,
+    json_dumps,
+    json_loads,
+    escape_kmarkdown,
+    unescape_kmarkdown,
+)
 
 if TYPE_CHECKING:
     from .bot import Bot
@@ -317,7 +326,7 @@ class Card(ReceivableMessageSegment):
     @classmethod
     def create(cls, content: Any) -> "Card":
         if not isinstance(content, str):
-            content = json.dumps(content)
+            content = json_dumps(content)
 
         return cls("card", {"content": content})
 
@@ -463,7 +472,7 @@ class LocalMedia(VirtualMessageSegment):
     if TYPE_CHECKING:
 
         class _LocalMediaData(TypedDict):
-            content: Optional[bytes] = None
+            content: Union[None, bytes, BytesReadable] = None
             title: Optional[str] = None
             file: Optional[Path] = None
 
@@ -473,8 +482,17 @@ class LocalMedia(VirtualMessageSegment):
         if self.data["file"] is None and self.data["content"] is None:
             raise KaiheilaAdapterException("file_path 与 content 均为 None")
 
+        content = self.data["content"]
+        if content is not None and not (
+            isinstance(content, bytes)
+            or (isinstance(content, IOBase) and content.seekable())
+        ):
+            # 不可定位的流只能读取一次, 保留读到的内容以便消息段再次发送
+            content = self.data["content"] = await run_sync(content.read)()
+
         file_key = await bot.upload_file(
-            self.data["content"] or self.data["file"], self.data["title"]
+            content if content is not None else self.data["file"],
+            self.data["title"],
         )
         return file_key
 
@@ -484,9 +502,9 @@ class LocalMedia(VirtualMessageSegment):
     ) -> "LocalMedia._LocalMediaData":
         data = {"title": title, "content": None, "file": None}
 
-        if isinstance(file, BytesReadable):
-            data["content"] = file.read()
-        elif isinstance(file, bytes):
+        # 文件流在上传时才读取, 避免创建消息段时阻塞事件循环;
+        # 可定位的流每次上传前回到开头, 不可定位的流首次上传时读取并缓存
+        if isinstance(file, (bytes, BytesReadable)):
             data["content"] = file
         else:
             data["file"] = Path(file)
@@ -569,7 +587,7 @@ class LocalAudio(LocalMedia):
     if TYPE_CHECKING:
 
         class _LocalAudioData(LocalMedia._LocalMediaData):
-            cover_content: Optional[bytes] = None
+            cover_content: Union[None, bytes, BytesReadable] = None
             cover_file: Optional[Path] = None
 
         data: _LocalAudioData
@@ -587,10 +605,10 @@ class LocalAudio(LocalMedia):
     async def _actual_seg(self, bot: "Bot") -> Optional[MessageSegment]:
         file_key = await self._upload(bot)
 
-        if self.data["cover_content"] or self.data["cover_file"]:
-            cover_file_key = await bot.upload_file(
-                self.data["cover_content"] or self.data["cover_file"]
-            )
+        if self.data["cover_content"] is not None:
+            cover_file_key = await bot.upload_file(self.data["cover_content"])
+        elif self.data["cover_file"] is not None:
+            cover_file_key = await bot.upload_file(self.data["cover_file"])
         else:
             cover_file_key = None
 
@@ -807,7 +825,7 @@ def _convert_to_card_message(msg: Message) -> MessageSegment:
                     {"type": "card", "theme": "none", "size": "lg", "modules": modules}
                 )
                 modules = []
-            cards.extend(json.loads(seg.data["content"]))
+            cards.extend(json_loads(seg.data["content"]))
         elif isinstance(seg, Text):
             modules.append(
                 {
@@ -854,9 +872,49 @@ def _convert_to_card_message(msg: Message) -> MessageSegment:
 class MessageSerializer:
     """
     开黑啦 协议 Message 序列化器。
+
+    虚拟消息段 (本地图片等) 并发转换为真实消息段, 最多同时转换 ``concurrency`` 个,
+    未指定时使用配置项 ``kaiheila_segment_concurrency``。转换后的消息段保持原有顺序;
+    有消息段转换失败时, 等待其余消息段完成后抛出顺序最靠前的异常。
     """
 
     message: Message
+    concurrency: Optional[int] = None
+
+    async def _resolve_virtual_segments(self, bot: "Bot") -> Message:
+        segments: list = list(self.message)
+        indexes = [
+            i
+            for i, seg in enumerate(segments)
+            if isinstance(seg, VirtualMessageSegment)
+        ]
+        if len(indexes) == 1:
+            segments[indexes[0]] = await segments[indexes[0]]._actual_seg(bot)
+        elif indexes:
+            concurrency = (
+                self.concurrency
+                or bot.adapter.kaiheila_config.kaiheila_segment_concurrency
+            )
+            semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+            async def resolve(seg: VirtualMessageSegment) -> Optional[MessageSegment]:
+                async with semaphore:
+                    return await seg._actual_seg(bot)
+
+            results = await asyncio.gather(
+                *(resolve(segments[i]) for i in indexes), return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            for i, result in zip(indexes, results):
+                segments[i] = result
+
+        new_message = Message()
+        for seg in segments:
+            if seg is not None:
+                new_message.append(seg)
+        return new_message
 
     async def serialize(self, bot: "Bot") -> dict:
         serialized_data = {}
@@ -868,15 +926,7 @@ class MessageSerializer:
             serialized_data["quote"] = cast(Quote, quote[-1]).data["msg_id"]
 
         # 将虚拟消息段转换为真实消息段
-        new_message = Message()
-        for seg in self.message:
-            if isinstance(seg, VirtualMessageSegment):
-                actual = await seg._actual_seg(bot)
-                if actual is not None:
-                    new_message.append(actual)
-            else:
-                new_message.append(seg)
-        self.message = new_message
+        self.message = await self._resolve_virtual_segments(bot)
 
         # 大于一段时，先尝试合并text与kmarkdown
         if len(self.message) != 1:
@@ -888,7 +938,7 @@ class MessageSerializer:
             card_msg = Message(_convert_to_card_message(self.message))
             serialized_data = {
                 **serialized_data,
-                **(await MessageSerializer(card_msg).serialize(bot)),
+                **(await MessageSerializer(card_msg, self.concurrency).serialize(bot)),
             }
         else:
             serialized_data = {
@@ -0,0 +1,213 @@
+import time
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING, Any, Dict, List, Deque, Tuple, NamedTuple
+
+from .utils import log
+from .message import Text, Message, KMarkdown
+from .exception import KaiheilaAdapterException
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+SLOW_MODE_TTL = 300.0
+"""频道慢速模式设置的缓存秒数"""
+
+
+class OutboxStats(NamedTuple):
+    """发送队列统计信息"""
+
+    sent: int
+    """实际发出的消息数"""
+    coalesced: int
+    """被合并到其他消息中的消息数"""
+    failed: int
+    """发送失败的消息数"""
+    pending: int
+    """排队中的消息数"""
+
+
+class _Pending(NamedTuple):
+    api: str
+    params: Dict[str, Any]
+    message: Message
+    future: "asyncio.Future[Any]"
+
+
+def _is_plain(item: _Pending) -> bool:
+    return set(item.params) == {"target_id"} and all(
+        isinstance(seg, (Text, KMarkdown)) for seg in item.message
+    )
+
+
+class Outbox:
+    """
+    :说明:
+
+      按发送目标 (频道或用户) 排队的发送队列。
+
+      同一目标的消息按提交顺序逐条发送, 不同目标之间互不影响; 每个目标只在有消息时占用一个协程。
+      请求经过限速器, bucket 额度用尽时队列随之等待; 开启 ``slow_mode`` 时,
+      频道消息之间至少间隔该频道的慢速模式时长。
+      ``coalesce_window`` 大于 0 时, 队首为纯文本/KMarkdown 消息时会等待该秒数,
+      将期间排队的同类消息以换行连接、``Message.reduce`` 合并后作为一条消息发送。
+
+    :参数:
+
+      * ``bot: Bot``: Bot 对象
+      * ``coalesce_window: float``: 合并消息的等待秒数, 0 表示不合并
+      * ``slow_mode: bool``: 是否遵守频道的慢速模式
+    """
+
+    def __init__(
+        self, bot: "Bot", coalesce_window: float = 0.0, slow_mode: bool = True
+    ):
+        self.bot = bot
+        self.coalesce_window = coalesce_window
+        self.slow_mode = slow_mode
+        self._queues: Dict[Tuple[str, str], Deque[_Pending]] = {}
+        self._workers: Dict[Tuple[str, str], "asyncio.Task[None]"] = {}
+        self._next_send_at: Dict[Tuple[str, str], float] = {}
+        self._slow_modes: Dict[str, Tuple[float, float]] = {}
+        self._evict_at = 0.0
+        self.sent = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    @property
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> OutboxStats:
+        return OutboxStats(
+            sent=self.sent,
+            coalesced=self.coalesced,
+            failed=self.failed,
+            pending=self.pending,
+        )
+
+    @property
+    def active(self) -> int:
+        """正在发送消息的目标数, 每个目标同时最多发送一条消息"""
+        return len(self._workers)
+
+    async def join(self) -> None:
+        """等待所有排队中的消息发送完成"""
+        while self._workers:
+            await asyncio.wait(list(self._workers.values()))
+
+    async def put(self, api: str, params: Dict[str, Any], message: Message) -> Any:
+        """
+        :说明:
+
+          提交一条消息并等待其发送完成, 返回 API 调用结果
+        """
+        key = (api, params["target_id"])
+        future = asyncio.get_running_loop().create_future()
+        self._evict_expired()
+        self._queues.setdefault(key, deque()).append(
+            _Pending(api, params, message, future)
+        )
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._run(key))
+        return await future
+
+    def _evict_expired(self) -> None:
+        """定期清理已过期的发送间隔与慢速模式缓存, 避免发送过的目标越积越多"""
+        now = time.monotonic()
+        if now < self._evict_at:
+            return
+        self._evict_at = now + SLOW_MODE_TTL
+        for key in [k for k, at in self._next_send_at.items() if at <= now]:
+            if key not in self._workers:
+                del self._next_send_at[key]
+        for channel_id in [k for k, v in self._slow_modes.items() if v[0] <= now]:
+            del self._slow_modes[channel_id]
+
+    async def _slow_mode_delay(self, channel_id: str) -> float:
+        now = time.monotonic()
+        cached = self._slow_modes.get(channel_id)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        try:
+            channel = await self.bot.channel_view(target_id=channel_id)
+            # 慢速模式以毫秒为单位 (5000, 10000, ...), 见 channel/update 文档
+            delay = (channel.slow_mode or 0) / 1000
+        except Exception as e:
+            log("DEBUG", f"Failed to get slow mode of channel {channel_id}", e)
+            delay = 0.0
+        self._slow_modes[channel_id] = (now + SLOW_MODE_TTL, delay)
+        return delay
+
+    def _take_batch(self, queue: Deque[_Pending], head: _Pending) -> List[_Pending]:
+        batch = [head]
+        while queue and queue[0].params == head.params and _is_plain(queue[0]):
+            item = queue.popleft()
+            if not item.future.done():
+                batch.append(item)
+        return batch
+
+    async def _run(self, key: Tuple[str, str]) -> None:
+        queue = self._queues[key]
+        batch: List[_Pending] = []
+        try:
+            while queue:
+                delay = self._next_send_at.get(key, 0.0) - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                head = queue.popleft()
+                if head.future.done():
+                    # 提交者已取消
+                    continue
+
+                batch = [head]
+                message = head.message
+                if self.coalesce_window > 0 and _is_plain(head):
+                    await asyncio.sleep(self.coalesce_window)
+                    batch = self._take_batch(queue, head)
+                    if len(batch) > 1:
+                        message = Message()
+                        for i, item in enumerate(batch):
+                            if i:
+                                message.append(Text.create("\n"))
+                            message.extend(item.message)
+                        message.reduce()
+                        self.coalesced += len(batch) - 1
+
+                try:
+                    result = await self.bot._send_message(
+                        head.api, head.params, message
+                    )
+                except Exception as e:
+                    self.failed += len(batch)
+                    for item in batch:
+                        if not item.future.done():
+                            item.future.set_exception(e)
+                else:
+                    self.sent += 1
+                    for item in batch:
+                        if not item.future.done():
+                            item.future.set_result(result)
+                batch = []
+
+                interval = 0.0
+                if (
+                    self.slow_mode
+                    and head.api == "message_create"
+                    and "temp_target_id" not in head.params
+                ):
+                    interval = await self._slow_mode_delay(head.params["target_id"])
+                self._next_send_at[key] = time.monotonic() + interval
+        finally:
+            # 协程被取消时, 让发送中与排队中的消息的提交者不再等待
+            for item in (*batch, *queue):
+                if not item.future.done():
+                    item.future.set_exception(
+                        KaiheilaAdapterException("发送队列已停止, 消息未发送")
+                    )
+            queue.clear()
+            del self._workers[key]
+            del self._queues[key]
+            if self._next_send_at.get(key, 0.0) <= time.monotonic():
+                self._next_send_at.pop(key, None)
@@ -0,0 +1,87 @@
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING, Any, Dict, Deque, Optional, AsyncIterator
+
+from .api.model import ListReturn
+
+if TYPE_CHECKING:
+    from .bot import Bot
+
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_CONCURRENCY = 3
+
+
+def _page_total(result: ListReturn) -> Optional[int]:
+    return result.meta.page_total if result.meta is not None else None
+
+
+def _discard(tasks: Deque["asyncio.Task[Any]"]) -> None:
+    for task in tasks:
+        if task.cancel():
+            continue
+        if not task.cancelled():
+            # 提前结束迭代时, 丢弃已完成页的异常
+            task.exception()
+    tasks.clear()
+
+
+async def paginate(
+    bot: "Bot",
+    api: str,
+    field: str,
+    params: Dict[str, Any],
+    page_size: int = DEFAULT_PAGE_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> AsyncIterator[Any]:
+    """
+    :说明:
+
+      逐个产出分页接口 ``api`` 返回的 ``field`` 列表中的元素。
+
+      处理当前页时已在拉取后续页面: 首页返回 ``page_total`` 后最多同时拉取 ``concurrency`` 页,
+      否则逐页预取下一页, 直到返回空页。页面按顺序产出, 内存中最多保留 ``concurrency + 1`` 页。
+      请求经过 ``call_api``, 同样受限速器与重试策略约束。提前结束迭代时取消未完成的请求。
+
+    :参数:
+
+      * ``bot: Bot``: Bot 对象
+      * ``api: str``: API 名称, 如 ``guild_userList``
+      * ``field: str``: 返回模型中列表字段的名称
+      * ``params: Dict[str, Any]``: 除分页参数外的 API 参数
+      * ``page_size: int``: 每页数量
+      * ``concurrency: int``: 最多同时拉取的页数
+    """
+    concurrency = max(concurrency, 1)
+
+    def fetch(page: int) -> "asyncio.Task[Any]":
+        return asyncio.ensure_future(
+            bot.call_api(api, **params, page=page, page_size=page_size)
+        )
+
+    pending: Deque["asyncio.Task[Any]"] = deque()
+    try:
+        result: ListReturn = await bot.call_api(
+            api, **params, page=1, page_size=page_size
+        )
+        page_total = _page_total(result)
+        next_page = 2
+        while True:
+            items = getattr(result, field, None) or []
+            if page_total is not None:
+                while next_page <= page_total and len(pending) < concurrency:
+                    pending.append(fetch(next_page))
+                    next_page += 1
+            elif items and not pending:
+                pending.append(fetch(next_page))
+                next_page += 1
+
+            for item in items:
+                yield item
+
+            if not pending:
+                return
+            result = await pending.popleft()
+            if page_total is None:
+                page_total = _page_total(result)
+    finally:
+        _discard(pending)
@@ -0,0 +1,162 @@
+import time
+import asyncio
+from typing import Dict, Tuple, Mapping, Optional, NamedTuple
+
+from .utils import log
+
+DEFAULT_RESET = 1.0
+
+
+class RateLimitStats(NamedTuple):
+    """限速统计信息"""
+
+    requests: int
+    """经过限速器的请求数"""
+    delayed: int
+    """因限速而等待过的请求数"""
+    total_wait: float
+    """累计等待秒数"""
+    max_wait: float
+    """单个请求的最长等待秒数"""
+    rate_limited: int
+    """收到 429 的次数"""
+
+
+class Bucket:
+    """单个 bucket 的限速状态, 由响应头 ``X-Rate-Limit-*`` 更新"""
+
+    __slots__ = ("limit", "remaining", "reset_at")
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: float = 0.0
+
+    def delay(self, now: float) -> float:
+        if self.remaining is None or self.remaining > 0:
+            return 0.0
+        if now >= self.reset_at:
+            # 已过重置时间, 乐观地恢复额度, 以响应头为准
+            self.remaining = self.limit
+            return 0.0
+        return self.reset_at - now
+
+
+class RateLimiter:
+    """
+    :说明:
+
+      根据开黑啦返回的 ``X-Rate-Limit-*`` 响应头调度请求。
+
+      每个 Bot (token) 的每个 bucket 单独计数, 额度用尽时请求在本地排队直到 bucket 重置,
+      而不是发出后收到 429; 触发全局限速 (``X-Rate-Limit-Global``) 时, 该 Bot 的所有请求一同等待。
+
+      https://developer.kaiheila.cn/doc/rate-limit
+    """
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], Bucket] = {}
+        self._route_buckets: Dict[str, str] = {}
+        self._global_reset_at: Dict[str, float] = {}
+        self._stats: Dict[str, RateLimitStats] = {}
+
+    def bucket_name(self, route: str) -> str:
+        return self._route_buckets.get(route, route)
+
+    def stats(self) -> Dict[str, RateLimitStats]:
+        """按 bucket 统计的等待情况"""
+        return dict(self._stats)
+
+    def _record(
+        self, bucket: str, waited: float = 0.0, rate_limited: bool = False
+    ) -> None:
+        stats = self._stats.get(bucket) or RateLimitStats(0, 0, 0.0, 0.0, 0)
+        self._stats[bucket] = RateLimitStats(
+            requests=stats.requests + (not rate_limited),
+            delayed=stats.delayed + (waited > 0),
+            total_wait=stats.total_wait + waited,
+            max_wait=max(stats.max_wait, waited),
+            rate_limited=stats.rate_limited + rate_limited,
+        )
+
+    async def acquire(self, token: str, route: str) -> float:
+        """
+        :说明:
+
+          等待直到 ``route`` 所在 bucket 与全局限速都有额度, 并占用一次额度。
+
+        :返回:
+
+          - ``float``: 本次等待的秒数
+        """
+        waited = 0.0
+        while True:
+            bucket_name = self.bucket_name(route)
+            bucket = self._buckets.get((token, bucket_name))
+            now = time.monotonic()
+            delay = max(self._global_reset_at.get(token, 0.0) - now, 0.0)
+            if bucket is not None:
+                delay = max(delay, bucket.delay(now))
+            if delay <= 0:
+                break
+            log("DEBUG", f"Rate limited on <y>{bucket_name}</y>, waiting {delay:.2f}s")
+            await asyncio.sleep(delay)
+            waited += delay
+
+        if bucket is not None and bucket.remaining is not None:
+            bucket.remaining -= 1
+        self._record(bucket_name, waited)
+        return waited
+
+    def update(
+        self, token: str, route: str, headers: Mapping[str, str], limited: bool = False
+    ) -> None:
+        """
+        :说明:
+
+          根据响应头更新限速状态, ``limited`` 表示该响应为 429
+        """
+        bucket_name = headers.get("X-Rate-Limit-Bucket")
+        if bucket_name:
+            self._route_buckets[route] = bucket_name
+        else:
+            bucket_name = self.bucket_name(route)
+
+        reset = _to_float(headers.get("X-Rate-Limit-Reset"))
+        now = time.monotonic()
+
+        if headers.get("X-Rate-Limit-Global") is not None:
+            self._global_reset_at[token] = now + (reset or DEFAULT_RESET)
+
+        bucket = self._buckets.get((token, bucket_name))
+        if bucket is None:
+            bucket = self._buckets[(token, bucket_name)] = Bucket()
+
+        limit = _to_int(headers.get("X-Rate-Limit-Limit"))
+        remaining = _to_int(headers.get("X-Rate-Limit-Remaining"))
+        if limit is not None:
+            bucket.limit = limit
+        if remaining is not None:
+            bucket.remaining = remaining
+        if reset is not None:
+            bucket.reset_at = now + reset
+
+        if limited:
+            bucket.remaining = 0
+            if reset is None:
+                bucket.reset_at = now + DEFAULT_RESET
+            self._record(bucket_name, rate_limited=True)
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
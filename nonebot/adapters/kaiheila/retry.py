@@ -0,0 +1,219 @@
+import time
+import random
+import socket
+import asyncio
+from typing import Dict, TypeVar, Callable, Optional, Awaitable, NamedTuple
+
+from .utils import log
+from .api.handle import api_method_map
+from .exception import ActionFailed, NetworkError, RateLimitException
+
+T = TypeVar("T")
+
+NONCE_ROUTES = frozenset({"message/create", "direct-message/create"})
+"""默认允许重试的消息发送接口, 会自动附带 ``nonce``"""
+
+_CONNECT_ERRORS = frozenset(
+    {"ConnectError", "ConnectTimeout", "ClientConnectorError", "PoolTimeout"}
+)
+"""各 HTTP 客户端中表示请求尚未发出的异常类名 (httpx / aiohttp)"""
+
+
+def is_connect_error(exc: BaseException) -> bool:
+    """
+    :说明:
+
+      异常是否发生在建立连接阶段, 此时请求尚未发出, 重试不会造成重复操作
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, (ConnectionRefusedError, socket.gaierror)):
+            return True
+        if any(cls.__name__ in _CONNECT_ERRORS for cls in type(exc).__mro__):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+class RetryStats(NamedTuple):
+    """单个接口的重试统计信息"""
+
+    attempts: int
+    """请求次数 (含重试)"""
+    retries: int
+    """重试次数"""
+    failures: int
+    """最终失败次数"""
+    budget_exhausted: int
+    """因重试预算耗尽而放弃重试的次数"""
+
+
+class RetryBudget:
+    """
+    :说明:
+
+      重试预算, 限制重试请求占总请求的比例, 避免故障时重试放大流量。
+
+      每个请求存入 ``ratio`` 个令牌, 每次重试取出 1 个; 令牌数不超过 ``max_tokens``,
+      初始有 ``min_tokens`` 个, 保证低流量时也能重试。
+    """
+
+    def __init__(
+        self, ratio: float = 0.2, min_tokens: float = 10.0, max_tokens: float = 100.0
+    ):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = min_tokens
+
+    def deposit(self) -> None:
+        self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+class RetryPolicy:
+    """
+    :说明:
+
+      API 调用的重试策略。
+
+      ``api_method_map`` 中的 GET 接口可以自由重试, 网络错误、5xx 与 429 都会重试。
+
+      ``message/create`` 与 ``direct-message/create`` 默认也会重试, 但服务端不会按 ``nonce`` 去重
+      (只原样返回), 请求发出后的超时或 5xx 重试可能导致消息重复发送; 因此非 GET 接口默认只在
+      429 与建立连接失败 (请求尚未发出) 时重试, ``retry_unsafe`` 为 ``True`` 时才在其他错误时重试。
+      其余接口默认不重试, 可通过 ``set_rule`` 单独设置。
+
+      等待时间优先使用 ``Retry-After`` / ``X-Rate-Limit-Reset``, 否则使用带抖动的指数退避。
+
+    :参数:
+
+      * ``max_retries: int``: 默认的最大重试次数
+      * ``base_delay: float``: 指数退避的基础等待秒数
+      * ``max_delay: float``: 单次最长等待秒数
+      * ``budget: RetryBudget``: 重试预算
+      * ``retry_unsafe: bool``: 非 GET 接口是否在请求可能已被处理的错误 (超时、5xx 等) 时重试
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        budget: Optional[RetryBudget] = None,
+        retry_unsafe: bool = False,
+    ):
+        self.max_retries = max_retries
+        self.retry_unsafe = retry_unsafe
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self._rules: Dict[str, int] = {}
+        self._stats: Dict[str, RetryStats] = {}
+
+    def set_rule(self, route: str, max_retries: int) -> None:
+        """为单个接口设置最大重试次数, 0 表示不重试"""
+        self._rules[route] = max_retries
+
+    def max_retries_for(self, route: str, method: str) -> int:
+        if route in self._rules:
+            return self._rules[route]
+        if route in NONCE_ROUTES:
+            return self.max_retries
+        if method == "GET" and route in api_method_map:
+            return self.max_retries
+        return 0
+
+    def stats(self) -> Dict[str, RetryStats]:
+        return dict(self._stats)
+
+    def _record(self, route: str, **delta: int) -> None:
+        stats = self._stats.get(route) or RetryStats(0, 0, 0, 0)
+        self._stats[route] = stats._replace(
+            **{key: getattr(stats, key) + value for key, value in delta.items()}
+        )
+
+    def is_retryable(
+        self, exc: Exception, retry_rate_limit: bool = True, idempotent: bool = True
+    ) -> bool:
+        if isinstance(exc, RateLimitException):
+            return retry_rate_limit
+        if not idempotent and not self.retry_unsafe:
+            # 请求可能已被服务端处理, 只在连接尚未建立时重试
+            return isinstance(exc, NetworkError) and is_connect_error(exc)
+        if isinstance(exc, ActionFailed):
+            return exc.status_code >= 500
+        return isinstance(exc, NetworkError)
+
+    def backoff(self, attempt: int, exc: Exception) -> float:
+        headers = getattr(exc, "headers", None) or {}
+        for header in ("Retry-After", "X-Rate-Limit-Reset"):
+            try:
+                return min(float(headers[header]), self.max_delay)
+            except (KeyError, TypeError, ValueError):
+                continue
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    async def call(
+        self,
+        route: str,
+        method: str,
+        send: Callable[[], Awaitable[T]],
+        retry_rate_limit: bool = True,
+    ) -> T:
+        """
+        :说明:
+
+          按策略调用 ``send``, 失败时按需重试。
+
+        :参数:
+
+          * ``route: str``: 接口路径
+          * ``method: str``: 请求方法
+          * ``send``: 发送一次请求的函数
+          * ``retry_rate_limit: bool``: 是否重试 429, 开启限速器时由限速器处理
+        """
+        max_retries = self.max_retries_for(route, method)
+        idempotent = method == "GET"
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            self._record(route, attempts=1)
+            try:
+                result = await send()
+            except Exception as e:
+                elapsed = time.monotonic() - start
+                if attempt >= max_retries or not self.is_retryable(
+                    e, retry_rate_limit, idempotent
+                ):
+                    self._record(route, failures=1)
+                    raise
+                if not self.budget.withdraw():
+                    self._record(route, failures=1, budget_exhausted=1)
+                    log(
+                        "WARNING",
+                        f"Retry budget exhausted, API <y>{route}</y> not retried",
+                    )
+                    raise
+                delay = self.backoff(attempt, e)
+                attempt += 1
+                self._record(route, retries=1)
+                log(
+                    "DEBUG",
+                    f"API <y>{route}</y> attempt {attempt} failed in {elapsed:.3f}s "
+                    f"({e!r}), retry {attempt}/{max_retries} after {delay:.2f}s",
+                )
+                await asyncio.sleep(delay)
+                continue
+            log(
+                "TRACE",
+                f"API <y>{route}</y> attempt {attempt + 1} succeeded "
+                f"in {time.monotonic() - start:.3f}s",
+            )
+            return result
@@ -0,0 +1,86 @@
+import time
+import heapq
+from typing import Any, Set, List, Tuple, Optional
+
+
+class SnBuffer:
+    """
+    :说明:
+
+      信令 0 (EVENT) 的 sn 重排窗口。
+
+      按 sn 连续递增的顺序释放消息: 提前到达的消息暂存在小顶堆中, 等缺失的 sn 到达后依次释放;
+      已处理或已在堆中的 sn 视为重复消息直接丢弃。缺口持续超过 ``gap_timeout`` 秒,
+      或暂存消息数超过 ``max_pending`` 时, ``gap_expired`` 返回 ``True``, 由调用方发起 resume。
+
+    :参数:
+
+      * ``last_sn: int``: 已处理的最新 sn
+      * ``gap_timeout: float``: 缺口的最长等待时间
+      * ``max_pending: int``: 最多暂存的消息数
+    """
+
+    def __init__(
+        self, last_sn: int = 0, gap_timeout: float = 6.0, max_pending: int = 1000
+    ):
+        self.last_sn = last_sn
+        self.gap_timeout = gap_timeout
+        self.max_pending = max_pending
+        self._heap: List[Tuple[int, Any]] = []
+        self._pending: Set[int] = set()
+        self._gap_since: Optional[float] = None
+        self.duplicated = 0
+
+    def push(self, sn: int, frame: Any) -> List[Any]:
+        """
+        :说明:
+
+          放入一条消息, 返回因此可以按顺序处理的消息列表 (可能为空)。
+        """
+        if sn <= self.last_sn or sn in self._pending:
+            self.duplicated += 1
+            return []
+
+        if sn != self.last_sn + 1:
+            heapq.heappush(self._heap, (sn, frame))
+            self._pending.add(sn)
+            if self._gap_since is None:
+                self._gap_since = time.monotonic()
+            return []
+
+        ready = [frame]
+        self.last_sn = sn
+        while self._heap and self._heap[0][0] == self.last_sn + 1:
+            sn, frame = heapq.heappop(self._heap)
+            self._pending.discard(sn)
+            self.last_sn = sn
+            ready.append(frame)
+        self._gap_since = time.monotonic() if self._heap else None
+        return ready
+
+    @property
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def gap_remaining(self) -> Optional[float]:
+        """当前缺口距离超时的剩余秒数, 没有缺口时返回 ``None``"""
+        if self._gap_since is None:
+            return None
+        return max(self.gap_timeout - (time.monotonic() - self._gap_since), 0.0)
+
+    def gap_expired(self) -> bool:
+        if self.pending > self.max_pending:
+            return True
+        remaining = self.gap_remaining()
+        return remaining is not None and remaining <= 0
+
+    def restart_gap(self) -> None:
+        """重新计算当前缺口的等待时间, 用于发起 resume 后等待服务端补发"""
+        if self._heap:
+            self._gap_since = time.monotonic()
+
+    def reset(self, last_sn: int = 0) -> None:
+        self.last_sn = last_sn
+        self._heap.clear()
+        self._pending.clear()
+        self._gap_since = None
@@ -2,7 +2,17 @@ import json
 import asyncio
 from io import StringIO
 from collections import UserDict
-from typing import Any, Dict, Tuple, Optional, Protocol, runtime_checkable
+from typing import (
+    Any,
+    Dict,
+    Tuple,
+    Union,
+    Callable,
+    Optional,
+    Protocol,
+    NamedTuple,
+    runtime_checkable,
+)
 
 from nonebot.utils import logger_wrapper
 from nonebot.internal.driver import Response
@@ -12,6 +22,88 @@ from .exception import ActionFailed
 log = logger_wrapper("Kaiheila")
 
 
+class JsonCodec(NamedTuple):
+    """JSON 编解码后端"""
+
+    name: str
+    loads: Callable[[Union[str, bytes]], Any]
+    """解码, 可直接接收 bytes"""
+    dumps: Callable[[Any], str]
+    """编码为 str"""
+
+
+def _json_codec() -> JsonCodec:
+    return JsonCodec("json", json.loads, json.dumps)
+
+
+def _orjson_codec() -> JsonCodec:
+    import orjson
+
+    return JsonCodec("orjson", orjson.loads, lambda obj: orjson.dumps(obj).decode())
+
+
+def _msgspec_codec() -> JsonCodec:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+    return JsonCodec(
+        "msgspec", decoder.decode, lambda obj: encoder.encode(obj).decode()
+    )
+
+
+_json_codec_factories: Dict[str, Callable[[], JsonCodec]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _json_codec,
+}
+
+
+def set_json_codec(name: Optional[str] = None) -> JsonCodec:
+    """
+    :说明:
+
+      设置 JSON 编解码后端。
+
+      未指定时依次尝试 ``orjson``、``msgspec``, 均未安装则使用标准库 ``json``;
+      指定的后端未安装时同样回退到标准库。
+
+    :参数:
+
+      * ``name: Optional[str]``: 后端名称, ``orjson``、``msgspec`` 或 ``json``
+
+    :返回:
+
+      - ``JsonCodec``: 实际使用的后端
+    """
+    global _codec
+
+    if name is not None and name not in _json_codec_factories:
+        raise ValueError(f"Unknown json codec: {name}")
+
+    for candidate in [name] if name else _json_codec_factories:
+        try:
+            _codec = _json_codec_factories[candidate]()
+            break
+        except ImportError:
+            if name is not None:
+                log("WARNING", f"JSON codec {name} is not installed, fallback to json")
+    else:
+        _codec = _json_codec()
+    return _codec
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    return _codec.loads(data)
+
+
+def json_dumps(obj: Any) -> str:
+    return _codec.dumps(obj)
+
+
+_codec: JsonCodec = set_json_codec()
+
+
 def _b2s(b: Optional[bool]) -> Optional[str]:
     """转换布尔值为字符串。"""
     return b if b is None else str(b).lower()
@@ -72,7 +164,7 @@ def _handle_api_result(response: Response) -> Any:
 
         - ``ActionFailed``: API 调用失败
     """
-    result = json.loads(response.content)
+    result = json_loads(response.content)
     if isinstance(result, dict):
         log("DEBUG", "API result " + str(result))
         if result.get("code") != 0:
@@ -94,6 +186,10 @@ class ResultStore:
     def get_sn(cls, self_id: str) -> int:
         return cls._sn_map.get(self_id, 0)
 
+    @classmethod
+    def clear_sn(cls, self_id: str) -> None:
+        cls._sn_map.pop(self_id, None)
+
 
 class AttrDict(UserDict):
     def __init__(self, data=None):